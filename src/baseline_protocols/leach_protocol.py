@@ -18,9 +18,15 @@ import random
 import math
 from typing import List, Tuple, Dict, Optional
 import matplotlib.pyplot as plt
+from scipy.spatial.distance import cdist
 
 class LEACHNode:
     """LEACH协议中的传感器节点"""
+
+    # 节点在仿真中被频繁访问，使用__slots__省去实例字典
+    __slots__ = ('node_id', 'x', 'y', 'initial_energy', 'current_energy',
+                 'is_alive', 'is_cluster_head', 'cluster_head_id', 'cluster_members',
+                 'ch_probability', 'last_ch_round', 'data_packets')
     
     def __init__(self, node_id: int, x: float, y: float, initial_energy: float = 2.0):
         self.node_id = node_id
@@ -57,9 +63,12 @@ class LEACHNode:
 
 class LEACHProtocol:
     """LEACH协议实现"""
+
+    # 不超过该节点数时缓存完整距离矩阵 (2000节点约32MB)
+    distance_cache_max_nodes = 2000
     
     def __init__(self, nodes: List[LEACHNode], base_station: Tuple[float, float],
-                 desired_ch_percentage: float = 0.1):
+                 desired_ch_percentage: float = 0.1, seed: Optional[int] = None):
         """
         初始化LEACH协议 - 严格按照权威LEACH实现
 
@@ -67,11 +76,17 @@ class LEACHProtocol:
             nodes: 传感器节点列表
             base_station: 基站坐标 (x, y)
             desired_ch_percentage: 期望的簇头百分比 (权威LEACH使用0.1)
+            seed: 簇头选举随机数种子 (None时由全局random派生)
         """
         self.nodes = nodes
+        self._alive_count = sum(1 for n in nodes if n.is_alive)
+        self._build_distance_cache()
         self.base_station = base_station
+        self._build_bs_distance_cache()
         self.desired_ch_percentage = desired_ch_percentage
         self.current_round = 0
+        # 簇头选举用私有随机数生成器，未指定seed时由全局random派生，random.seed后结果仍可复现
+        self._rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
 
         # 能量消耗模型参数 (严格按照权威LEACH)
         self.E_elec = 50e-9  # 电子能耗 (J/bit) - 权威LEACH参数
@@ -96,12 +111,48 @@ class LEACHProtocol:
         self.network_lifetime = 0
         self.energy_consumption_per_round = []
         self.alive_nodes_per_round = []
+        # run_simulation期间的逐轮预分配缓冲 (按轮索引写入)
+        self._round_energy_buf = None
+        self._round_alive_buf = None
 
         print(f"🔧 LEACH协议初始化完成")
         print(f"   节点数: {len(self.nodes)}")
         print(f"   基站位置: {self.base_station}")
         print(f"   期望簇头比例: {self.desired_ch_percentage*100:.1f}%")
     
+    def _build_distance_cache(self):
+        """节点静止，预先计算节点间距离矩阵；节点过多时退回按行即时计算"""
+        self._row = {n.node_id: i for i, n in enumerate(self.nodes)}
+        self._xy = np.array([[n.x, n.y] for n in self.nodes], dtype=float).reshape(-1, 2)
+        if len(self.nodes) <= self.distance_cache_max_nodes:
+            self._D = cdist(self._xy, self._xy)
+        else:
+            self._D = None
+
+    def _build_bs_distance_cache(self):
+        """节点与基站都静止，节点到基站距离只算一次 (按_row行号索引)"""
+        dx = self._xy[:, 0] - self.base_station[0]
+        dy = self._xy[:, 1] - self.base_station[1]
+        self._d_to_bs = np.sqrt(dx ** 2 + dy ** 2)
+
+    def _bs_distance(self, node) -> float:
+        """节点到基站距离（查表）"""
+        return float(self._d_to_bs[self._row[node.node_id]])
+
+    def _distance_block(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """rows中各节点到cols中各节点的距离子矩阵"""
+        if self._D is not None:
+            return self._D[np.ix_(rows, cols)]
+        diff = self._xy[rows, None, :] - self._xy[cols]
+        return np.hypot(diff[..., 0], diff[..., 1])
+
+    def _distance(self, a, b) -> float:
+        """两节点间距离（查表）"""
+        i, j = self._row[a.node_id], self._row[b.node_id]
+        if self._D is not None:
+            return float(self._D[i, j])
+        return a.distance_to(b)
+    
     def calculate_transmission_energy(self, distance: float, packet_size: int) -> float:
         """计算传输能耗"""
         if distance < self.d_crossover:
@@ -123,31 +174,24 @@ class LEACHProtocol:
             for node in self.nodes:
                 node.last_ch_round = -1
         
-        for node in self.nodes:
-            if not node.is_alive:
-                continue
-                
-            # 如果节点在当前周期内已经当过簇头，则不能再次当选
-            rounds_since_ch = self.current_round - node.last_ch_round
-            if rounds_since_ch < (1 / self.desired_ch_percentage):
-                continue
-            
-            # 计算阈值
-            remaining_nodes = len([n for n in self.nodes if n.is_alive and 
-                                 (self.current_round - n.last_ch_round) >= (1 / self.desired_ch_percentage)])
-            
-            if remaining_nodes == 0:
-                continue
-                
-            threshold = self.desired_ch_percentage / (1 - self.desired_ch_percentage * 
-                                                    (self.current_round % (1 / self.desired_ch_percentage)))
-            
-            # 随机数判断
-            random_value = random.random()
-            if random_value < threshold:
-                node.is_cluster_head = True
-                node.last_ch_round = self.current_round
-                cluster_heads.append(node)
+        # 本轮候选节点：存活且在当前周期内未当过簇头
+        period = 1 / self.desired_ch_percentage
+        candidates = [node for node in self.nodes
+                      if node.is_alive and (self.current_round - node.last_ch_round) >= period]
+        if not candidates:
+            return cluster_heads
+
+        # 计算阈值（同一轮内对所有候选节点相同）
+        threshold = self.desired_ch_percentage / (1 - self.desired_ch_percentage *
+                                                (self.current_round % period))
+
+        # 一次性完成所有候选节点的伯努利抽样
+        draws = self._rng.random(len(candidates))
+        for idx in np.flatnonzero(draws < threshold).tolist():
+            node = candidates[idx]
+            node.is_cluster_head = True
+            node.last_ch_round = self.current_round
+            cluster_heads.append(node)
 
         # 不强制选择簇头 - 允许某些轮次没有簇头（符合权威LEACH行为）
         return cluster_heads
@@ -164,32 +208,30 @@ class LEACHProtocol:
             ch.is_cluster_head = True
 
         # 非簇头节点选择最近的簇头（权威LEACH的条件判断）
-        for node in self.nodes:
-            if not node.is_alive or node.is_cluster_head:
-                continue
-
-            min_distance = float('inf')
-            closest_ch = None
-
-            # 找到最近的簇头
-            for ch in cluster_heads:
-                distance = node.distance_to(ch)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_ch = ch
-
-            # 权威LEACH的关键逻辑：只有满足条件才加入簇头
-            if closest_ch:
-                distance_to_bs = math.sqrt((node.x - self.base_station[0])**2 +
-                                         (node.y - self.base_station[1])**2)
-
-                # 条件1: 在无线电范围内 AND 条件2: 比到基站更近
-                if min_distance <= self.radio_range and min_distance < distance_to_bs:
-                    node.cluster_head_id = closest_ch.node_id
-                    closest_ch.cluster_members.append(node)
-                # 否则cluster_head_id保持None，表示直接连基站
+        if not cluster_heads:
+            return  # 没有簇头时所有节点直接连基站
+        members = [node for node in self.nodes if node.is_alive and not node.is_cluster_head]
+        if not members:
+            return
+
+        # 成员×簇头距离子矩阵一次取出，逐行argmin得到最近簇头
+        rows = np.array([self._row[node.node_id] for node in members], dtype=int)
+        ch_rows = np.array([self._row[ch.node_id] for ch in cluster_heads], dtype=int)
+        distances = self._distance_block(rows, ch_rows)
+        nearest = distances.argmin(axis=1)
+        min_distances = distances[np.arange(len(members)), nearest]
+
+        # 权威LEACH的关键逻辑：只有满足条件才加入簇头
+        # 条件1: 在无线电范围内 AND 条件2: 比到基站更近
+        joins = (min_distances <= self.radio_range) & (min_distances < self._d_to_bs[rows])
+        for node, k, join in zip(members, nearest.tolist(), joins.tolist()):
+            if join:
+                closest_ch = cluster_heads[k]
+                node.cluster_head_id = closest_ch.node_id
+                closest_ch.cluster_members.append(node)
+            # 否则cluster_head_id保持None，表示直接连基站
     
-    def data_transmission_phase(self, cluster_heads: List[LEACHNode]):
+    def data_transmission_phase(self, cluster_heads: List[LEACHNode], round_idx: Optional[int] = None):
         """数据传输阶段 - 严格按照权威LEACH实现"""
         round_energy_consumption = 0.0
 
@@ -207,13 +249,13 @@ class LEACHProtocol:
                         if not member.is_alive:
                             continue
 
-                        distance = member.distance_to(ch)
+                        distance = self._distance(member, ch)
                         tx_energy = self.calculate_transmission_energy(distance, self.packet_size)
                         rx_energy = self.calculate_reception_energy(self.packet_size)
 
                         if member.current_energy >= tx_energy and ch.current_energy >= rx_energy:
-                            member.consume_energy(tx_energy)
-                            ch.consume_energy(rx_energy)
+                            self._consume_energy(member, tx_energy)
+                            self._consume_energy(ch, rx_energy)
                             round_energy_consumption += tx_energy + rx_energy
 
                             # 统一端到端统计口径：簇内仅视为中继，不计入源→BS送达
@@ -227,12 +269,11 @@ class LEACHProtocol:
                     continue
 
                 if node.cluster_head_id is None:
-                    bs_distance = math.sqrt((node.x - self.base_station[0])**2 +
-                                          (node.y - self.base_station[1])**2)
+                    bs_distance = self._bs_distance(node)
                     tx_energy = self.calculate_transmission_energy(bs_distance, self.packet_size)
 
                     if node.current_energy >= tx_energy:
-                        node.consume_energy(tx_energy)
+                        self._consume_energy(node, tx_energy)
                         round_energy_consumption += tx_energy
 
                         self.packets_sent += 1
@@ -250,14 +291,13 @@ class LEACHProtocol:
                     aggregation_energy = self.E_DA * self.packet_size * len(ch.cluster_members)
 
                     # 向基站传输
-                    bs_distance = math.sqrt((ch.x - self.base_station[0])**2 +
-                                          (ch.y - self.base_station[1])**2)
+                    bs_distance = self._bs_distance(ch)
                     tx_energy = self.calculate_transmission_energy(bs_distance, self.packet_size)
 
                     total_ch_energy = aggregation_energy + tx_energy
 
                     if ch.current_energy >= total_ch_energy:
-                        ch.consume_energy(total_ch_energy)
+                        self._consume_energy(ch, total_ch_energy)
                         round_energy_consumption += total_ch_energy
 
                         self.packets_sent += 1
@@ -268,16 +308,26 @@ class LEACHProtocol:
             break
 
         self.total_energy_consumed += round_energy_consumption
-        self.energy_consumption_per_round.append(round_energy_consumption)
+        if round_idx is None:
+            self.energy_consumption_per_round.append(round_energy_consumption)
+        else:
+            self._round_energy_buf[round_idx] = round_energy_consumption
     
-    def run_round(self) -> bool:
+    def _consume_energy(self, node, energy_amount: float):
+        """扣减节点能量，节点由存活转为死亡时同步存活计数"""
+        was_alive = node.is_alive
+        node.consume_energy(energy_amount)
+        if was_alive and not node.is_alive:
+            self._alive_count -= 1
+
+    def run_round(self, round_idx: Optional[int] = None) -> bool:
         """运行一轮LEACH协议"""
         # 检查网络是否还有存活节点
-        alive_nodes = [n for n in self.nodes if n.is_alive]
-        if not alive_nodes:
+        if self._alive_count == 0:
             return False
         
         self.current_round += 1
+        current_alive = self._alive_count
         
         # 1. 簇头选择阶段
         cluster_heads = self.cluster_head_selection()
@@ -286,10 +336,9 @@ class LEACHProtocol:
         self.cluster_formation(cluster_heads)
         
         # 3. 数据传输阶段
-        self.data_transmission_phase(cluster_heads)
+        self.data_transmission_phase(cluster_heads, round_idx)
         
         # 4. 更新统计信息
-        current_alive = len(alive_nodes)
         current_dead = len(self.nodes) - current_alive
         
         if current_dead > self.dead_nodes:
@@ -297,7 +346,10 @@ class LEACHProtocol:
             if self.network_lifetime == 0 and current_dead > 0:
                 self.network_lifetime = self.current_round
         
-        self.alive_nodes_per_round.append(current_alive)
+        if round_idx is None:
+            self.alive_nodes_per_round.append(current_alive)
+        else:
+            self._round_alive_buf[round_idx] = current_alive
         
         return True
     
@@ -305,19 +357,29 @@ class LEACHProtocol:
         """运行完整的LEACH仿真"""
         print(f"🚀 开始LEACH协议仿真 (最大轮数: {max_rounds})")
         
+        # 按最大轮数预分配逐轮记录缓冲，按索引写入
+        self._round_energy_buf = np.empty(max_rounds)
+        self._round_alive_buf = np.empty(max_rounds, dtype=np.int64)
+        rounds_run = 0
+
         for round_num in range(max_rounds):
-            success = self.run_round()
+            success = self.run_round(round_num)
             
             if not success:
                 print(f"⚠️ 网络生命周期结束于第 {round_num} 轮")
                 break
+            rounds_run += 1
             
             # 每100轮输出一次状态
             if round_num % 100 == 0:
-                alive_count = len([n for n in self.nodes if n.is_alive])
-                print(f"   第{round_num}轮: 存活节点={alive_count}, "
+                print(f"   第{round_num}轮: 存活节点={self._alive_count}, "
                       f"总能耗={self.total_energy_consumed:.3f}J")
         
+        # 截去未运行的预分配轮次，以列表形式追加到逐轮序列 (run_round()单独调用仍可append)
+        self.energy_consumption_per_round.extend(self._round_energy_buf[:rounds_run].tolist())
+        self.alive_nodes_per_round.extend(self._round_alive_buf[:rounds_run].tolist())
+        self._round_energy_buf = self._round_alive_buf = None
+
         # 返回性能结果
         results = {
             'protocol_name': 'LEACH',
@@ -17,9 +17,60 @@ import numpy as np
 import math
 from typing import List, Tuple, Dict, Optional
 import matplotlib.pyplot as plt
+from scipy.spatial.distance import cdist
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba为可选依赖，缺失时退回NumPy掩码argmin
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit('int64[:](float64[:, :], int64)', cache=True)
+    def _greedy_chain(xy, start):
+        """
+        贪心建链内核
+
+        从第start个节点出发，每次选择距离当前链端最近 (平方距离最小) 的未入链节点；
+        直接由坐标计算，不依赖距离矩阵。距离相等时取位置靠前者，与np.argmin一致。
+        逐步依赖上一步的链端，步内扫描只有几十到几百个候选，串行比prange的线程调度更快。
+
+        返回:
+            链上各节点在xy中的行号
+        """
+        n = xy.shape[0]
+        order = np.empty(n, dtype=np.int64)
+        visited = np.zeros(n, dtype=np.bool_)
+        cur = start
+        visited[cur] = True
+        order[0] = cur
+        for k in range(1, n):
+            cx = xy[cur, 0]
+            cy = xy[cur, 1]
+            best = -1
+            best_d = np.inf
+            for j in range(n):
+                if visited[j]:
+                    continue
+                dx = xy[j, 0] - cx
+                dy = xy[j, 1] - cy
+                d = dx * dx + dy * dy
+                if d < best_d:
+                    best_d = d
+                    best = j
+            cur = best
+            visited[cur] = True
+            order[k] = cur
+        return order
 
 class PEGASISNode:
     """PEGASIS协议中的传感器节点"""
+
+    # 节点在仿真中被频繁访问，使用__slots__省去实例字典
+    __slots__ = ('node_id', 'x', 'y', 'initial_energy', 'current_energy',
+                 'is_alive', 'is_leader', 'next_node', 'prev_node',
+                 'chain_position', 'data_packets')
     
     def __init__(self, node_id: int, x: float, y: float, initial_energy: float = 2.0):
         self.node_id = node_id
@@ -38,7 +89,7 @@ class PEGASISNode:
         
     def distance_to(self, other_node) -> float:
         """计算到另一个节点的欧几里得距离"""
-        return math.sqrt((self.x - other_node.x)**2 + (self.y - other_node.y)**2)
+        return math.hypot(self.x - other_node.x, self.y - other_node.y)
     
     def consume_energy(self, energy_amount: float):
         """消耗能量"""
@@ -56,6 +107,9 @@ class PEGASISNode:
 
 class PEGASISProtocol:
     """PEGASIS协议实现"""
+
+    # 不超过该节点数时缓存完整距离矩阵 (2000节点约32MB)
+    distance_cache_max_nodes = 2000
     
     def __init__(self, nodes: List[PEGASISNode], base_station: Tuple[float, float]):
         """
@@ -66,10 +120,16 @@ class PEGASISProtocol:
             base_station: 基站坐标 (x, y)
         """
         self.nodes = nodes
+        self._alive_count = sum(1 for n in nodes if n.is_alive)
+        self._build_distance_cache()
         self.base_station = base_station
+        self._build_bs_distance_cache()
         self.current_round = 0
         self.chain = []
         self.leader_index = 0
+        # 上次完整建链时的链长度，存活数低于其80%时才重新建链
+        self.rebuild_threshold = 0.8
+        self._last_rebuild_alive = 0
         
         # 能量消耗模型参数 (与LEACH保持一致)
         self.E_elec = 50e-9  # 电子能耗 (J/bit)
@@ -90,6 +150,9 @@ class PEGASISProtocol:
         self.network_lifetime = 0
         self.energy_consumption_per_round = []
         self.alive_nodes_per_round = []
+        # run_simulation期间的逐轮预分配缓冲 (按轮索引写入)
+        self._round_energy_buf = None
+        self._round_alive_buf = None
 
         # 初始化链结构
         self.construct_chain()
@@ -99,6 +162,39 @@ class PEGASISProtocol:
         print(f"   基站位置: {self.base_station}")
         print(f"   链长度: {len(self.chain)}")
     
+    def _build_distance_cache(self):
+        """节点静止，预先计算节点间距离矩阵；节点过多时退回按行即时计算"""
+        self._row = {n.node_id: i for i, n in enumerate(self.nodes)}
+        self._xy = np.array([[n.x, n.y] for n in self.nodes], dtype=float).reshape(-1, 2)
+        if len(self.nodes) <= self.distance_cache_max_nodes:
+            self._D = cdist(self._xy, self._xy)
+        else:
+            self._D = None
+
+    def _build_bs_distance_cache(self):
+        """节点与基站都静止，节点到基站距离只算一次 (按_row行号索引)"""
+        dx = self._xy[:, 0] - self.base_station[0]
+        dy = self._xy[:, 1] - self.base_station[1]
+        self._d_to_bs = np.sqrt(dx ** 2 + dy ** 2)
+
+    def _bs_distance(self, node) -> float:
+        """节点到基站距离（查表）"""
+        return float(self._d_to_bs[self._row[node.node_id]])
+
+    def _distance_row(self, i: int, cols: np.ndarray) -> np.ndarray:
+        """第i行节点到cols中各节点的距离"""
+        if self._D is not None:
+            return self._D[i, cols]
+        diff = self._xy[cols] - self._xy[i]
+        return np.hypot(diff[:, 0], diff[:, 1])
+
+    def _distance(self, a, b) -> float:
+        """两节点间距离（查表）"""
+        i, j = self._row[a.node_id], self._row[b.node_id]
+        if self._D is not None:
+            return float(self._D[i, j])
+        return a.distance_to(b)
+    
     def calculate_transmission_energy(self, distance: float, packet_size: int) -> float:
         """计算传输能耗"""
         if distance < self.d_crossover:
@@ -109,6 +205,20 @@ class PEGASISProtocol:
     def calculate_reception_energy(self, packet_size: int) -> float:
         """计算接收能耗"""
         return self.E_elec * packet_size
+
+    def _chain_hop_energies(self) -> List[float]:
+        """链上相邻节点(i, i+1)逐跳发送能耗，整条链一次向量化算出"""
+        rows = np.array([self._row[n.node_id] for n in self.chain], dtype=int)
+        if self._D is not None:
+            d = self._D[rows[:-1], rows[1:]]
+        else:
+            diff = self._xy[rows[1:]] - self._xy[rows[:-1]]
+            d = np.hypot(diff[:, 0], diff[:, 1])
+        bits = self.packet_size
+        amp = np.where(d < self.d_crossover,
+                       self.E_fs * bits * (d ** 2),
+                       self.E_mp * bits * (d ** 4))
+        return (self.E_elec * bits + amp).tolist()
     
     def construct_chain(self):
         """构建贪心链结构"""
@@ -120,42 +230,28 @@ class PEGASISProtocol:
         for node in alive_nodes:
             node.reset_chain_info()
         
-        self.chain = []
-        remaining_nodes = alive_nodes.copy()
-        
         # 选择起始节点（距离基站最远的节点）
-        max_distance = 0
-        start_node = None
-        for node in remaining_nodes:
-            distance = math.sqrt((node.x - self.base_station[0])**2 + 
-                               (node.y - self.base_station[1])**2)
-            if distance > max_distance:
-                max_distance = distance
-                start_node = node
-        
-        if start_node is None:
-            start_node = remaining_nodes[0]
-        
-        self.chain.append(start_node)
-        remaining_nodes.remove(start_node)
+        rows = np.array([self._row[n.node_id] for n in alive_nodes])
+        start_idx = int(self._d_to_bs[rows].argmax())
         
         # 贪心算法构建链
-        while remaining_nodes:
-            last_node = self.chain[-1]
-            min_distance = float('inf')
-            closest_node = None
-            
-            for node in remaining_nodes:
-                distance = last_node.distance_to(node)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_node = node
-            
-            if closest_node:
-                self.chain.append(closest_node)
-                remaining_nodes.remove(closest_node)
-            else:
-                break
+        if NUMBA_AVAILABLE:
+            order = _greedy_chain(self._xy[rows], start_idx).tolist()
+        else:
+            # 用布尔掩码标记已入链节点，O(1)移除
+            remaining_mask = np.ones(len(alive_nodes), dtype=bool)
+            remaining_mask[start_idx] = False
+            last_idx = start_idx
+            order = [start_idx]
+
+            for _ in range(len(alive_nodes) - 1):
+                d = self._distance_row(rows[last_idx], rows)
+                d[~remaining_mask] = np.inf
+                last_idx = int(d.argmin())
+                remaining_mask[last_idx] = False
+                order.append(last_idx)
+        
+        self.chain = [alive_nodes[i] for i in order]
         
         # 设置链中节点的前后关系
         for i, node in enumerate(self.chain):
@@ -164,6 +260,23 @@ class PEGASISProtocol:
                 node.prev_node = self.chain[i-1]
             if i < len(self.chain) - 1:
                 node.next_node = self.chain[i+1]
+        
+        self._last_rebuild_alive = len(self.chain)
+    
+    def splice_dead_nodes(self):
+        """将死亡节点从链中摘除（前驱与后继直接相连），不重新建链"""
+        for node in self.chain:
+            if node.is_alive:
+                continue
+            if node.prev_node is not None:
+                node.prev_node.next_node = node.next_node
+            if node.next_node is not None:
+                node.next_node.prev_node = node.prev_node
+            node.reset_chain_info()
+        
+        self.chain = [n for n in self.chain if n.is_alive]
+        for i in range(len(self.chain)):
+            self.chain[i].chain_position = i
     
     def select_leader(self) -> Optional[PEGASISNode]:
         """选择链首节点（轮转方式）"""
@@ -178,108 +291,166 @@ class PEGASISProtocol:
         
         return leader
     
-    def data_transmission_phase(self, leader: PEGASISNode):
+    def data_transmission_phase(self, leader: PEGASISNode, round_idx: Optional[int] = None):
         """数据传输阶段"""
         round_energy_consumption = 0.0
         
         # 1. 沿链传输数据到领导者
         # 从链的两端开始向领导者传输
         leader_pos = leader.chain_position
-        
-        # 处理领导者左侧的节点
-        for i in range(leader_pos - 1, -1, -1):
-            current_node = self.chain[i]
-            if not current_node.is_alive:
-                continue
-            
-            next_node = self.chain[i + 1]
-            if not next_node.is_alive:
-                # 寻找下一个存活的节点
-                for j in range(i + 2, len(self.chain)):
-                    if self.chain[j].is_alive:
-                        next_node = self.chain[j]
-                        break
-                else:
+        # 相邻节点的发送能耗批量预算；仅在跳过死亡节点时才单独计算
+        hop_tx = self._chain_hop_energies()
+        rx_energy = self.calculate_reception_energy(self.packet_size)
+
+        # 常见情形：链上节点全部存活且本轮无节点死亡，整条链一次结算
+        chain_energy = self._chain_energy_after_gather(leader_pos, hop_tx, rx_energy)
+        if chain_energy is not None:
+            for node, energy in zip(self.chain, chain_energy.tolist()):
+                node.current_energy = energy
+            # 与逐跳处理相同的顺序累加：先左侧 (由近到远)，再右侧
+            for tx_energy in hop_tx[:leader_pos][::-1] + hop_tx[leader_pos:]:
+                round_energy_consumption += tx_energy + rx_energy
+            n_hops = len(self.chain) - 1
+            self.packets_sent += n_hops
+            self.packets_received += n_hops
+        else:
+            # 逐跳处理 (需处理跳过死亡节点与中途死亡)
+            # 处理领导者左侧的节点
+            for i in range(leader_pos - 1, -1, -1):
+                current_node = self.chain[i]
+                if not current_node.is_alive:
                     continue
-            
-            # 传输数据
-            distance = current_node.distance_to(next_node)
-            tx_energy = self.calculate_transmission_energy(distance, self.packet_size)
-            rx_energy = self.calculate_reception_energy(self.packet_size)
-            
-            current_node.consume_energy(tx_energy)
-            next_node.consume_energy(rx_energy)
-            
-            round_energy_consumption += tx_energy + rx_energy
-            self.packets_sent += 1
-            if next_node.is_alive:
-                self.packets_received += 1
-        
-        # 处理领导者右侧的节点
-        for i in range(leader_pos + 1, len(self.chain)):
-            current_node = self.chain[i]
-            if not current_node.is_alive:
-                continue
-            
-            prev_node = self.chain[i - 1]
-            if not prev_node.is_alive:
-                # 寻找前一个存活的节点
-                for j in range(i - 2, -1, -1):
-                    if self.chain[j].is_alive:
-                        prev_node = self.chain[j]
-                        break
-                else:
+
+                next_node = self.chain[i + 1]
+                tx_energy = hop_tx[i]
+                if not next_node.is_alive:
+                    # 寻找下一个存活的节点
+                    for j in range(i + 2, len(self.chain)):
+                        if self.chain[j].is_alive:
+                            next_node = self.chain[j]
+                            break
+                    else:
+                        continue
+                    distance = self._distance(current_node, next_node)
+                    tx_energy = self.calculate_transmission_energy(distance, self.packet_size)
+
+                # 传输数据
+
+                self._consume_energy(current_node, tx_energy)
+                self._consume_energy(next_node, rx_energy)
+
+                round_energy_consumption += tx_energy + rx_energy
+                self.packets_sent += 1
+                if next_node.is_alive:
+                    self.packets_received += 1
+
+            # 处理领导者右侧的节点
+            for i in range(leader_pos + 1, len(self.chain)):
+                current_node = self.chain[i]
+                if not current_node.is_alive:
                     continue
-            
-            # 传输数据
-            distance = current_node.distance_to(prev_node)
-            tx_energy = self.calculate_transmission_energy(distance, self.packet_size)
-            rx_energy = self.calculate_reception_energy(self.packet_size)
-            
-            current_node.consume_energy(tx_energy)
-            prev_node.consume_energy(rx_energy)
-            
-            round_energy_consumption += tx_energy + rx_energy
-            self.packets_sent += 1
-            if prev_node.is_alive:
-                self.packets_received += 1
-        
-        # 2. 数据聚合
+
+                prev_node = self.chain[i - 1]
+                tx_energy = hop_tx[i - 1]
+                if not prev_node.is_alive:
+                    # 寻找前一个存活的节点
+                    for j in range(i - 2, -1, -1):
+                        if self.chain[j].is_alive:
+                            prev_node = self.chain[j]
+                            break
+                    else:
+                        continue
+                    distance = self._distance(current_node, prev_node)
+                    tx_energy = self.calculate_transmission_energy(distance, self.packet_size)
+
+                # 传输数据
+
+                self._consume_energy(current_node, tx_energy)
+                self._consume_energy(prev_node, rx_energy)
+
+                round_energy_consumption += tx_energy + rx_energy
+                self.packets_sent += 1
+                if prev_node.is_alive:
+                    self.packets_received += 1
+
+        # 2. 数据聚合 + 3. 领导者向基站传输聚合数据（计入端到端送达）
+        # 两项能耗都由领导者在同一轮承担，合并为一次扣减
         if leader.is_alive:
             alive_count = len([n for n in self.chain if n.is_alive])
             aggregation_energy = self.E_DA * self.packet_size * alive_count
-            leader.consume_energy(aggregation_energy)
-            round_energy_consumption += aggregation_energy
 
-        # 3. 领导者向基站传输聚合数据（计入端到端送达）
-        if leader.is_alive:
-            bs_distance = math.sqrt((leader.x - self.base_station[0])**2 +
-                                  (leader.y - self.base_station[1])**2)
-            tx_energy = self.calculate_transmission_energy(bs_distance, self.packet_size)
-            leader.consume_energy(tx_energy)
-            round_energy_consumption += tx_energy
+            if leader.current_energy > aggregation_energy:
+                bs_distance = self._bs_distance(leader)
+                tx_energy = self.calculate_transmission_energy(bs_distance, self.packet_size)
+                total_leader_energy = aggregation_energy + tx_energy
+                self._consume_energy(leader, total_leader_energy)
+                round_energy_consumption += total_leader_energy
 
-            self.packets_sent += 1
-            # 统一端到端口径：领导者聚合后的上行视为将 alive_count 条源包送达BS
-            self.total_bs_delivered += alive_count
-            self.total_source_packets += alive_count
+                self.packets_sent += 1
+                # 统一端到端口径：领导者聚合后的上行视为将 alive_count 条源包送达BS
+                self.total_bs_delivered += alive_count
+                self.total_source_packets += alive_count
+            else:
+                # 聚合阶段即耗尽能量，无法上行
+                self._consume_energy(leader, aggregation_energy)
+                round_energy_consumption += aggregation_energy
 
         self.total_energy_consumed += round_energy_consumption
-        self.energy_consumption_per_round.append(round_energy_consumption)
+        if round_idx is None:
+            self.energy_consumption_per_round.append(round_energy_consumption)
+        else:
+            self._round_energy_buf[round_idx] = round_energy_consumption
     
-    def run_round(self) -> bool:
+    def _chain_energy_after_gather(self, leader_pos: int, hop_tx: List[float],
+                                   rx_energy: float) -> Optional[np.ndarray]:
+        """
+        向量化计算链上逐跳传输后各节点的剩余能量
+
+        每个非领导者节点先发送一次 (hop_tx)，再接收一次来自外侧邻居的数据 (链两端除外)；
+        领导者依次接收左、右两侧各一次。扣减顺序与逐跳循环一致，结果逐位相同。
+        链上有死亡节点或本轮会有节点死亡时返回None，由逐跳循环处理。
+        """
+        chain = self.chain
+        n = len(chain)
+        if not all(node.is_alive for node in chain):
+            return None
+
+        energy = np.array([node.current_energy for node in chain], dtype=float)
+        hop = np.asarray(hop_tx, dtype=float)
+        energy[:leader_pos] -= hop[:leader_pos]
+        energy[leader_pos + 1:] -= hop[leader_pos:]
+        energy[1:leader_pos] -= rx_energy
+        energy[leader_pos + 1:n - 1] -= rx_energy
+        if leader_pos > 0:
+            energy[leader_pos] -= rx_energy
+        if leader_pos < n - 1:
+            energy[leader_pos] -= rx_energy
+
+        if not (energy > 0).all():
+            return None
+        return energy
+
+    def _consume_energy(self, node, energy_amount: float):
+        """扣减节点能量，节点由存活转为死亡时同步存活计数"""
+        was_alive = node.is_alive
+        node.consume_energy(energy_amount)
+        if was_alive and not node.is_alive:
+            self._alive_count -= 1
+
+    def run_round(self, round_idx: Optional[int] = None) -> bool:
         """运行一轮PEGASIS协议"""
         # 检查网络是否还有存活节点
-        alive_nodes = [n for n in self.nodes if n.is_alive]
-        if not alive_nodes:
+        if self._alive_count == 0:
             return False
         
         self.current_round += 1
+        current_alive = self._alive_count
         
-        # 1. 重构链（如果有节点死亡）
-        current_alive = len(alive_nodes)
-        if current_alive != len([n for n in self.chain if n.is_alive]):
+        # 1. 维护链结构：少量死亡时局部摘除，存活数显著下降时才重新建链
+        if current_alive < self.rebuild_threshold * self._last_rebuild_alive:
             self.construct_chain()
+        elif current_alive != len(self.chain):
+            self.splice_dead_nodes()
         
         # 2. 选择领导者
         leader = self.select_leader()
@@ -287,7 +458,7 @@ class PEGASISProtocol:
             return False
         
         # 3. 数据传输阶段
-        self.data_transmission_phase(leader)
+        self.data_transmission_phase(leader, round_idx)
         
         # 4. 更新统计信息
         current_dead = len(self.nodes) - current_alive
@@ -297,7 +468,10 @@ class PEGASISProtocol:
             if self.network_lifetime == 0 and current_dead > 0:
                 self.network_lifetime = self.current_round
         
-        self.alive_nodes_per_round.append(current_alive)
+        if round_idx is None:
+            self.alive_nodes_per_round.append(current_alive)
+        else:
+            self._round_alive_buf[round_idx] = current_alive
         
         return True
     
@@ -305,19 +479,29 @@ class PEGASISProtocol:
         """运行完整的PEGASIS仿真"""
         print(f"🚀 开始PEGASIS协议仿真 (最大轮数: {max_rounds})")
         
+        # 按最大轮数预分配逐轮记录缓冲，按索引写入
+        self._round_energy_buf = np.empty(max_rounds)
+        self._round_alive_buf = np.empty(max_rounds, dtype=np.int64)
+        rounds_run = 0
+
         for round_num in range(max_rounds):
-            success = self.run_round()
+            success = self.run_round(round_num)
             
             if not success:
                 print(f"⚠️ 网络生命周期结束于第 {round_num} 轮")
                 break
+            rounds_run += 1
             
             # 每100轮输出一次状态
             if round_num % 100 == 0:
-                alive_count = len([n for n in self.nodes if n.is_alive])
-                print(f"   第{round_num}轮: 存活节点={alive_count}, "
+                print(f"   第{round_num}轮: 存活节点={self._alive_count}, "
                       f"总能耗={self.total_energy_consumed:.3f}J")
         
+        # 截去未运行的预分配轮次，以列表形式追加到逐轮序列 (run_round()单独调用仍可append)
+        self.energy_consumption_per_round.extend(self._round_energy_buf[:rounds_run].tolist())
+        self.alive_nodes_per_round.extend(self._round_alive_buf[:rounds_run].tolist())
+        self._round_energy_buf = self._round_alive_buf = None
+
         # 返回性能结果
         results = {
             'protocol_name': 'PEGASIS',
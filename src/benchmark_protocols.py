@@ -25,17 +25,166 @@ WSN基准路由协议标准实现
 """
 
 import numpy as np
-import math
 import random
-from typing import List, Dict, Tuple, Optional
+import os
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, NamedTuple
 from dataclasses import dataclass
-from enum import Enum
-import copy
+import functools
+from scipy.spatial.distance import cdist
 
 from improved_energy_model import ImprovedEnergyModel, HardwarePlatform
 from heed_protocol import HEEDProtocol, HEEDConfig
 from teen_protocol import TEENProtocol, TEENConfig
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba为可选依赖，缺失时退回纯Python循环
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit('Tuple((float64, int64, int64))(float64[:], float64[:], boolean[:], int64, '
+          'float64, float64, float64, float64, float64, float64, float64, float64)', cache=True)
+    def _pegasis_gather(hop, energy, alive, leader_index, base_tx, amp_coef, bits,
+                        d_threshold, temp_factor, humidity_factor, rx_energy, leader_cost):
+        """
+        PEGASIS数据收集内核 (两端向领导者逐跳传输，再由领导者向基站发送)
+
+        hop[i]为链上第i与第i+1个节点的距离；energy/alive按链位置排列并原地更新。
+        发送能耗公式与ImprovedEnergyModel.calculate_transmission_energy一致 (0 dBm)。
+        leader_cost为领导者向基站发送与聚合处理的总能耗，领导者存活时扣除。
+
+        返回:
+            (总能耗, 发送包数, 接收包数)
+        """
+        n = energy.shape[0]
+        total = 0.0
+        n_tx = 0
+        for step in range(n - 1):
+            # 先左侧 0->leader，再右侧 n-1->leader
+            if step < leader_index:
+                src = step
+                dst = step + 1
+                d = hop[step]
+            else:
+                src = n - 1 - (step - leader_index)
+                dst = src - 1
+                d = hop[dst]
+            if not alive[src] or not alive[dst]:
+                continue
+
+            if d <= d_threshold:
+                amp = amp_coef * (d ** 2) * 1e-9 * bits
+            else:
+                amp = amp_coef * (d ** 4) * 1e-12 * bits
+            tx = (base_tx + amp) * temp_factor * humidity_factor
+
+            energy[src] -= tx
+            energy[dst] -= rx_energy
+            total += tx + rx_energy
+            n_tx += 1
+
+            if energy[src] <= 0:
+                alive[src] = False
+                energy[src] = 0.0
+            if energy[dst] <= 0:
+                alive[dst] = False
+                energy[dst] = 0.0
+
+        n_rx = n_tx
+        if alive[leader_index]:
+            energy[leader_index] -= leader_cost
+            total += leader_cost
+            n_tx += 1
+            if energy[leader_index] <= 0:
+                alive[leader_index] = False
+                energy[leader_index] = 0.0
+        return total, n_tx, n_rx
+
+    @njit('Tuple((int64, float64))(float64[:], boolean[:])', cache=True)
+    def _alive_energy(energy, alive):
+        """
+        存活节点数与剩余总能量
+
+        按节点id顺序逐个累加，与sum(energy[alive].tolist())结果逐位一致。
+        """
+        count = 0
+        total = 0.0
+        for i in range(energy.shape[0]):
+            if alive[i]:
+                count += 1
+                total += energy[i]
+        return count, total
+
+    @njit('int64[:](float64[:, :], int64[:], int64)', cache=True)
+    def _pegasis_chain(D, alive_ids, start):
+        """
+        PEGASIS贪心建链内核
+
+        从alive_ids中位置start的节点出发，每次选择距离当前链端最近的未访问节点。
+        距离相等时取位置靠前者，与np.argmin行为一致。
+
+        返回:
+            链上各节点在alive_ids中的位置
+        """
+        n = alive_ids.shape[0]
+        order = np.empty(n, dtype=np.int64)
+        visited = np.zeros(n, dtype=np.bool_)
+        cur = start
+        visited[cur] = True
+        order[0] = cur
+        for k in range(1, n):
+            row = alive_ids[cur]
+            best = -1
+            best_d = np.inf
+            for j in range(n):
+                if visited[j]:
+                    continue
+                d = D[row, alive_ids[j]]
+                if d < best_d:
+                    best_d = d
+                    best = j
+            cur = best
+            visited[cur] = True
+            order[k] = cur
+        return order
+
+    @njit('int64[:](float64[:, :], int64[:], int64[:])', cache=True)
+    def _leach_assign(pos, member_idx, ch_idx):
+        """
+        LEACH成簇内核：每个成员节点归入平方距离最近的簇头
+
+        节点规模约百级，串行双重循环即可；距离相等时取ch_idx中靠前者，与np.argmin一致。
+
+        返回:
+            各成员节点所属簇头的节点id
+        """
+        m = member_idx.shape[0]
+        k = ch_idx.shape[0]
+        assign = np.empty(m, dtype=np.int64)
+        for i in range(m):
+            px = pos[member_idx[i], 0]
+            py = pos[member_idx[i], 1]
+            best = 0
+            best_d = np.inf
+            for j in range(k):
+                dx = px - pos[ch_idx[j], 0]
+                dy = py - pos[ch_idx[j], 1]
+                d = dx * dx + dy * dy
+                if d < best_d:
+                    best_d = d
+                    best = j
+            assign[i] = ch_idx[best]
+        return assign
+
+# run_simulation进度行模板 (预先绑定format)
+_LEACH_PROGRESS = "   轮数 {}: 存活节点 {}, 剩余能量 {:.3f}J".format
+_PEGASIS_PROGRESS = "   轮数 {}: 存活节点 {}, 剩余能量 {:.3f}J, 链长度 {}".format
+
 @dataclass
 class Node:
     """WSN节点基础类"""
@@ -52,6 +201,93 @@ class Node:
         if self.current_energy is None:
             self.current_energy = self.initial_energy
 
+
+def _soa_property(array_name: str, cast, column: Optional[int] = None):
+    """生成映射到协议SoA数组某个元素的属性"""
+    if column is None:
+        def fget(self):
+            return cast(getattr(self._net, array_name)[self.id])
+
+        def fset(self, value):
+            getattr(self._net, array_name)[self.id] = value
+    else:
+        def fget(self):
+            return cast(getattr(self._net, array_name)[self.id, column])
+
+        def fset(self, value):
+            getattr(self._net, array_name)[self.id, column] = value
+    return property(fget, fset)
+
+
+class NodeView(Node):
+    """
+    SoA存储中单个节点的视图
+    节点状态保存在协议对象的NumPy数组中 (pos/initial/energy/alive/is_ch/cluster_id)，
+    本类只做属性映射，保持原Node接口供外部脚本读写
+    """
+
+    def __init__(self, net, node_id: int):
+        self._net = net
+        self.id = node_id
+
+    x = _soa_property('pos', float, 0)
+    y = _soa_property('pos', float, 1)
+    initial_energy = _soa_property('initial', float)
+    current_energy = _soa_property('energy', float)
+    is_alive = _soa_property('alive', bool)
+    is_cluster_head = _soa_property('is_ch', bool)
+    cluster_id = _soa_property('cluster_id', int)
+
+
+def _init_node_arrays(net, config: 'NetworkConfig'):
+    """
+    按SoA布局初始化网络节点
+    节点坐标由协议自己的随机数生成器 net._rng 一次生成
+    """
+    n = config.num_nodes
+    net.pos = net._rng.uniform([0.0, 0.0], [config.area_width, config.area_height], size=(n, 2))
+    net.initial = np.full(n, config.initial_energy, dtype=np.float64)
+    net.energy = net.initial.copy()
+    net.alive = np.ones(n, dtype=bool)
+    net.is_ch = np.zeros(n, dtype=bool)
+    net.cluster_id = np.full(n, -1, dtype=np.int32)
+    net.nodes = [NodeView(net, i) for i in range(n)]
+
+class RadioConstants(NamedTuple):
+    """
+    能耗模型在固定包长、发射功率和环境参数下的标量常数
+    tx()与ImprovedEnergyModel.calculate_transmission_energy逐位一致，供热点循环直接内联计算
+    """
+    bits: int
+    base_tx: float
+    amp_coef: float
+    d_threshold: float
+    temp_factor: float
+    humidity_factor: float
+    rx: float
+
+    @classmethod
+    def from_model(cls, model: ImprovedEnergyModel, bits: int, tx_power_dbm: float = 0.0,
+                   temperature_c: float = 25.0, humidity_ratio: float = 0.5) -> 'RadioConstants':
+        return cls(
+            bits=bits,
+            base_tx=bits * model.params.tx_energy_per_bit,
+            amp_coef=(10**(tx_power_dbm / 10) / 1000) / model.params.amplifier_efficiency,
+            d_threshold=model.params.path_loss_threshold,
+            temp_factor=1 + model.temperature_coefficient * abs(temperature_c - 25.0),
+            humidity_factor=1 + model.humidity_coefficient * humidity_ratio,
+            rx=model.calculate_reception_energy(bits, temperature_c, humidity_ratio)
+        )
+
+    def tx(self, distance: float) -> float:
+        """发送一个包的能耗"""
+        if distance <= self.d_threshold:
+            amp = self.amp_coef * (distance ** 2) * 1e-9 * self.bits
+        else:
+            amp = self.amp_coef * (distance ** 4) * 1e-12 * self.bits
+        return (self.base_tx + amp) * self.temp_factor * self.humidity_factor
+
+
 @dataclass
 class NetworkConfig:
     """网络配置参数"""
@@ -69,21 +305,43 @@ class LEACHProtocol:
     基于Heinzelman et al. (HICSS 2000)原始论文的科学重构版本
     """
     
-    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel):
+    # run_simulation逐轮记录的字段 (与run_round返回字典的键同名)
+    ROUND_RECORD_DTYPE = np.dtype([('round', 'i4'), ('alive_nodes', 'i4'),
+                                   ('total_remaining_energy', 'f8'), ('cluster_heads', 'i4')])
+
+    # 前debug_rounds轮输出调试信息 (设为0关闭)
+    debug_rounds = 5
+    # run_simulation是否输出开始/进度/结束信息 (批量仿真时设为False)
+    verbose = True
+
+    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel,
+                 seed: Optional[int] = None):
         self.config = config
         self.energy_model = energy_model
         self.nodes = []
         self.round_number = 0
         self.cluster_heads = []
-        self.clusters = {}
         
         # LEACH参数 (基于原始论文)
         self.desired_cluster_head_percentage = 0.1
         self.cluster_head_rotation_rounds = int(1 / self.desired_cluster_head_percentage)
+        # 阈值T(n)只取决于轮号对轮换周期的余数，周期内各轮阈值预先算好
+        P = self.desired_cluster_head_percentage
+        self._ch_thresholds = [P / (1 - P * i) for i in range(self.cluster_head_rotation_rounds)]
         
         # 新增：数据传输概率，用于模拟更真实的场景
         self.data_transmission_probability = 0.95  # 95%的概率进行数据传输
 
+        # 能耗模型常数预先取出，热点循环中直接内联计算
+        self._bits = config.packet_size * 8
+        self._radio = RadioConstants.from_model(energy_model, self._bits)
+        # 包长固定，批量发送/聚合能耗函数预先绑定包长参数
+        self._tx_batch = functools.partial(energy_model.calculate_transmission_energy_batch, self._bits)
+        self._aggregation_energy = energy_model.calculate_processing_energy
+
+        # 网络初始总能量，逐轮统计本轮能耗时直接使用
+        self._initial_total_energy = config.num_nodes * config.initial_energy
+
         # 性能统计
         self.stats = {
             'network_lifetime': 0,
@@ -93,103 +351,123 @@ class LEACHProtocol:
             'cluster_formation_overhead': 0,
             'round_statistics': []
         }
+        # run_round返回的逐轮统计按记录字段累加，求均值时无需再遍历round_statistics
+        self._round_stat_sums = dict.fromkeys(self.ROUND_RECORD_DTYPE.names, 0)
         
+        # 协议私有随机数生成器 (节点部署、簇头选择、数据传输)
+        # 未指定seed时由全局random派生，random.seed后结果仍可复现
+        self._rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+
         self._initialize_network()
     
     def _initialize_network(self):
-        """初始化网络节点"""
-        self.nodes = []
-        for i in range(self.config.num_nodes):
-            x = random.uniform(0, self.config.area_width)
-            y = random.uniform(0, self.config.area_height)
-            node = Node(
-                id=i,
-                x=x,
-                y=y,
-                initial_energy=self.config.initial_energy,
-                current_energy=self.config.initial_energy
-            )
-            self.nodes.append(node)
+        """初始化网络节点 (SoA数组存储，self.nodes为NodeView视图)"""
+        _init_node_arrays(self, self.config)
+
+        # 节点静止，到基站距离与节点间距离矩阵只需计算一次
+        self.d_to_bs = np.hypot(self.pos[:, 0] - self.config.base_station_x,
+                                self.pos[:, 1] - self.config.base_station_y)
+        self.D = cdist(self.pos, self.pos)
+
+        # 存活索引 (仅在节点死亡时刷新)
+        self._alive_idx = np.arange(self.config.num_nodes)
+        self._member_count = np.zeros(self.config.num_nodes, dtype=np.int64)
+
+    def _kill_node(self, node: Node):
+        """标记节点死亡并刷新存活索引"""
+        self._kill_nodes(np.array([node.id]))
+
+    def _kill_nodes(self, ids: np.ndarray):
+        """批量标记节点死亡并刷新存活索引"""
+        if ids.size == 0:
+            return
+        self.alive[ids] = False
+        self.energy[ids] = 0
+        self._alive_idx = np.flatnonzero(self.alive)
     
     def _calculate_distance(self, node1: Node, node2: Node) -> float:
-        """计算两节点间距离"""
-        return math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+        """两节点间距离 (查距离矩阵)"""
+        return float(self.D[node1.id, node2.id])
     
     def _calculate_distance_to_bs(self, node: Node) -> float:
-        """计算节点到基站距离"""
-        return math.sqrt((node.x - self.config.base_station_x)**2 +
-                        (node.y - self.config.base_station_y)**2)
+        """节点到基站距离 (查预计算表)"""
+        return float(self.d_to_bs[node.id])
 
     def _select_cluster_heads(self) -> List[Node]:
         """
         LEACH簇头选择算法 (重构)
-        基于概率阈值和轮换机制
+        基于概率阈值和轮换机制，整轮随机数一次生成
         """
-        cluster_heads = []
-        
-        P = self.desired_cluster_head_percentage
         r = self.round_number
         
-        # 计算阈值 T(n)
+        # 阈值 T(n) = P / (1 - P * (r mod 1/P))，查预计算表
         # 简化但有效的阈值计算，确保簇头比例稳定
-        threshold = P / (1 - P * (r % self.cluster_head_rotation_rounds))
+        threshold = self._ch_thresholds[r % self.cluster_head_rotation_rounds]
         
-        successful_selections = 0
-        for node in self.nodes:
-            if not node.is_alive:
-                continue
-
-            # 节点根据阈值独立决定是否成为簇头
-            if random.random() < threshold:
-                node.is_cluster_head = True
-                cluster_heads.append(node)
-                successful_selections += 1
-            else:
-                node.is_cluster_head = False
+        # 节点根据阈值独立决定是否成为簇头 (使用本轮预生成随机数的前N个)
+        draws = self._round_rand[:-1]
+        ch_mask = self.alive & (draws < threshold)
+        successful_selections = int(ch_mask.sum())
 
         # 调试输出
-        if r < 5:
-            print(f"[调试] 轮{r}: 阈值={threshold:.4f}, 尝试={sum(1 for n in self.nodes if n.is_alive)}, 成功={successful_selections}")
-
-        # 如果没有选出簇头，则强制选择一个（避免网络完全停滞）
-        if not cluster_heads and any(n.is_alive for n in self.nodes):
-            alive_nodes = [n for n in self.nodes if n.is_alive]
-            chosen_one = random.choice(alive_nodes)
-            chosen_one.is_cluster_head = True
-            cluster_heads.append(chosen_one)
-            if r < 5:
-                print(f"[调试] 轮{r}: 未选出簇头，强制选择节点 {chosen_one.id}")
-
-        return cluster_heads
+        debug = r < self.debug_rounds
+        if debug:
+            print(f"[调试] 轮{r}: 阈值={threshold:.4f}, 尝试={self._alive_idx.size}, 成功={successful_selections}")
+
+        # 如果没有选出簇头，则强制选择剩余能量最高的节点（避免网络完全停滞）
+        if not successful_selections and self._alive_idx.size:
+            chosen_id = int(self._alive_idx[self.energy[self._alive_idx].argmax()])
+            ch_mask[chosen_id] = True
+            if debug:
+                print(f"[调试] 轮{r}: 未选出簇头，强制选择节点 {chosen_id}")
+
+        self.is_ch[:] = ch_mask
+        return [self.nodes[i] for i in np.flatnonzero(ch_mask)]
+
+    @property
+    def clusters(self) -> Dict[int, Dict]:
+        """
+        本轮簇结构 {簇头id: {'head': 簇头, 'members': [成员]}} (兼容旧接口)
+        按需由cluster_id数组生成，成员保持节点编号顺序
+        """
+        order = np.argsort(self.cluster_id, kind='stable')
+        sorted_ids = self.cluster_id[order]
+        ch_ids = np.array([ch.id for ch in self.cluster_heads], dtype=sorted_ids.dtype)
+        starts = np.searchsorted(sorted_ids, ch_ids, side='left').tolist()
+        ends = np.searchsorted(sorted_ids, ch_ids, side='right').tolist()
+        return {
+            ch.id: {'head': ch, 'members': [self.nodes[i] for i in order[lo:hi].tolist()]}
+            for ch, lo, hi in zip(self.cluster_heads, starts, ends)
+        }
 
     def _form_clusters(self, cluster_heads: List[Node]):
         """
         形成簇结构 (重构)
-        非簇头节点加入最近的簇头
+        非簇头节点加入最近的簇头，归属只写入cluster_id数组 (簇结构视图见clusters属性)
         """
-        self.clusters = {ch.id: {'head': ch, 'members': []} for ch in cluster_heads}
-        
-        for node in self.nodes:
-            if not node.is_alive or node.is_cluster_head:
-                continue
+        # 各簇头的成员数 (按节点id索引)，簇头->基站阶段直接使用
+        self._member_count = np.zeros(self.config.num_nodes, dtype=np.int64)
 
-            if not cluster_heads:
-                node.cluster_id = -1
-                continue
+        member_idx = self._alive_idx[~self.is_ch[self._alive_idx]]
+        if member_idx.size == 0:
+            return
 
-            # 找到最近的簇头
-            min_distance = float('inf')
-            nearest_ch = None
-            for ch in cluster_heads:
-                distance = self._calculate_distance(node, ch)
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_ch = ch
-            
-            # 将节点分配给最近的簇头
-            if nearest_ch:
-                node.cluster_id = nearest_ch.id
-                self.clusters[nearest_ch.id]['members'].append(node)
+        if not cluster_heads:
+            self.cluster_id[member_idx] = -1
+            return
+
+        ch_idx = np.array([ch.id for ch in cluster_heads], dtype=np.int64)
+        if NUMBA_AVAILABLE:
+            assign = _leach_assign(self.pos, member_idx.astype(np.int64, copy=False), ch_idx)
+        else:
+            # 成员×簇头平方距离矩阵，一次argmin得到最近簇头
+            diff = self.pos[member_idx, None, :] - self.pos[ch_idx, :]
+            d2 = np.einsum('ijk,ijk->ij', diff, diff)
+            assign = ch_idx[d2.argmin(axis=1)]
+
+        # 将节点分配给最近的簇头
+        self.cluster_id[member_idx] = assign
+        self._member_count = np.bincount(assign, minlength=self.config.num_nodes)
 
     def _steady_state_communication(self):
         """
@@ -200,54 +478,71 @@ class LEACHProtocol:
         packets_transmitted = 0
         packets_received = 0
 
-        # 1. 成员节点向簇头发送数据
-        for cluster_id, cluster_info in self.clusters.items():
-            ch = cluster_info['head']
-            if not ch.is_alive:
-                continue
-
-            for member in cluster_info['members']:
-                if not member.is_alive:
-                    continue
-
-                distance = self._calculate_distance(member, ch)
-                tx_energy = self.energy_model.calculate_transmission_energy(self.config.packet_size * 8, distance)
-                rx_energy = self.energy_model.calculate_reception_energy(self.config.packet_size * 8)
-
-                if member.current_energy > tx_energy and ch.current_energy > rx_energy:
-                    member.current_energy -= tx_energy
-                    ch.current_energy -= rx_energy
-                    total_energy_consumed += tx_energy + rx_energy
-                    packets_transmitted += 1
-                    packets_received += 1
-                else:
-                    if member.current_energy <= tx_energy: member.is_alive = False; member.current_energy = 0
-                    if ch.current_energy <= rx_energy: ch.is_alive = False; ch.current_energy = 0
-
-        # 2. 簇头向基站发送聚合数据
-        for ch in self.cluster_heads:
-            if not ch.is_alive:
-                continue
-
-            distance_to_bs = self._calculate_distance_to_bs(ch)
-            num_members = len(self.clusters.get(ch.id, {}).get('members', []))
-            
-            # 聚合能耗
-            aggregation_energy = self.energy_model.calculate_processing_energy(self.config.packet_size * 8 * (num_members + 1)) # +1 for CH's own data
-            
-            # 传输能耗
-            tx_energy_to_bs = self.energy_model.calculate_transmission_energy(self.config.packet_size * 8, distance_to_bs)
-            
+        energy = self.energy
+        alive = self.alive
+
+        bits = self._bits
+        rx_energy = self._radio.rx
+
+        # 1. 成员节点向簇头发送数据 (全部成员一次批量结算)
+        # 成员按 (所属簇头, 节点编号) 排序，与逐簇逐成员处理的顺序一致
+        member_ids = np.flatnonzero(alive & ~self.is_ch & (self.cluster_id >= 0))
+        member_ids = member_ids[alive[self.cluster_id[member_ids]]]
+        if member_ids.size:
+            member_ids = member_ids[np.argsort(self.cluster_id[member_ids], kind='stable')]
+            ch_of = self.cluster_id[member_ids].astype(np.int64)
+
+            tx_energy = self._tx_batch(self.D[member_ids, ch_of])
+            can_send = energy[member_ids] > tx_energy
+
+            # 各簇在成员序列中的起止位置
+            starts = np.flatnonzero(np.r_[True, ch_of[1:] != ch_of[:-1]])
+            group = np.cumsum(np.r_[False, ch_of[1:] != ch_of[:-1]])
+            group_ch = ch_of[starts]
+
+            # 簇头每接收一包扣除rx_energy，剩余能量大于rx_energy时才能继续接收
+            ch_energy = energy[group_ch]
+            capacity = np.maximum(np.ceil(ch_energy / rx_energy - 1), 0)
+
+            # 能发送的成员在本簇中的先后名次，名次小于簇头容量者被接收
+            sent_before = np.cumsum(can_send) - can_send
+            rank = sent_before - sent_before[starts][group]
+            accepted = can_send & (rank < capacity[group])
+
+            n_accept = np.bincount(group, weights=accepted, minlength=starts.size)
+            energy[member_ids[accepted]] -= tx_energy[accepted]
+            energy[group_ch] = ch_energy - n_accept * rx_energy
+            total_energy_consumed += float((tx_energy[accepted] + rx_energy).sum())
+            packets_transmitted += int(accepted.sum())
+            packets_received += int(accepted.sum())
+
+            # 簇头能量耗尽后，只要其后还有成员尝试发送即判定死亡
+            position = np.arange(member_ids.size)
+            last_accepted = np.maximum.reduceat(np.where(accepted, position, -1), starts)
+            group_end = np.r_[starts[1:], member_ids.size] - 1
+            ch_dead = (n_accept >= capacity) & (last_accepted < group_end)
+
+            # 能量不足以发送的成员死亡
+            self._kill_nodes(np.concatenate((member_ids[~can_send], group_ch[ch_dead])))
+
+        # 2. 簇头向基站发送聚合数据 (各簇头相互独立，一次批量结算)
+        ch_ids = np.array([ch.id for ch in self.cluster_heads], dtype=int)
+        ch_ids = ch_ids[alive[ch_ids]]
+        if ch_ids.size:
+            num_members = self._member_count[ch_ids]
+
+            # 聚合能耗 (+1 为簇头自身数据) 与传输能耗
+            aggregation_energy = self._aggregation_energy(bits * (num_members + 1))
+            tx_energy_to_bs = self._tx_batch(self.d_to_bs[ch_ids])
             total_ch_energy_cost = aggregation_energy + tx_energy_to_bs
 
-            if ch.current_energy > total_ch_energy_cost:
-                ch.current_energy -= total_ch_energy_cost
-                total_energy_consumed += total_ch_energy_cost
-                packets_transmitted += 1
-                packets_received += 1 # To BS
-            else:
-                ch.is_alive = False
-                ch.current_energy = 0
+            can_send = energy[ch_ids] > total_ch_energy_cost
+            energy[ch_ids[can_send]] -= total_ch_energy_cost[can_send]
+            total_energy_consumed += float(total_ch_energy_cost[can_send].sum())
+            packets_transmitted += int(can_send.sum())
+            packets_received += int(can_send.sum())  # To BS
+
+            self._kill_nodes(ch_ids[~can_send])
 
         # 更新统计
         self.stats['total_energy_consumed'] += total_energy_consumed
@@ -255,101 +550,145 @@ class LEACHProtocol:
         self.stats['packets_received'] += packets_received
     
     def run_round(self) -> Dict:
-        """运行一轮LEACH协议 (重构)"""
+        """运行一轮LEACH协议并返回本轮统计 (对外接口)"""
         
-        if not any(n.is_alive for n in self.nodes):
+        if not self._alive_idx.size:
             return self._get_round_statistics()
+
+        self._execute_round()
+        round_stats = self._get_round_statistics()
+        self.stats['round_statistics'].append(round_stats)
+        for key in self._round_stat_sums:
+            self._round_stat_sums[key] += round_stats[key]
+
+        return round_stats
+
+    def _execute_round(self):
+        """执行一轮LEACH协议 (重构)，不生成统计字典"""
         
         # 1. 重置状态并选择簇头
-        for node in self.nodes:
-            node.is_cluster_head = False
-            node.cluster_id = -1
+        self.is_ch[:] = False
+        self.cluster_id[:] = -1
+
+        # 本轮全部均匀随机数一次生成：前N个用于簇头选举，最后一个决定是否传输
+        # (与先random(N)再random()取到的序列相同)
+        self._round_rand = self._rng.random(self.config.num_nodes + 1)
         
         cluster_heads = self._select_cluster_heads()
         self.cluster_heads = cluster_heads
-        
-        if self.round_number <= 5:
-            print(f"[调试] 选择后活跃簇头: {len(cluster_heads)}")
 
-        # 2. 形成簇
-        self._form_clusters(cluster_heads)
-        
-        if self.round_number <= 5:
-            active_members = sum(len(c['members']) for c in self.clusters.values())
-            print(f"[调试] 簇形成后: {len(self.clusters)}个簇, {active_members}个成员")
+        # 调试统计只在前几轮计算，之后整轮只判断这一次
+        debug = self.round_number < self.debug_rounds
+        if debug:
+            print(f"[调试] 选择后活跃簇头: {len(cluster_heads)}")
 
-        # 3. 稳态通信 (有概率跳过)
-        if random.random() < self.data_transmission_probability:
+        # 2-3. 形成簇并稳态通信 (有概率跳过)
+        # 是否传输在轮初已由随机数决定；跳过传输的轮次簇结构不会被使用，不再成簇
+        # (簇头仍照常选出，逐轮簇头统计不受影响)
+        if self._round_rand[-1] < self.data_transmission_probability:
+            self._form_clusters(cluster_heads)
+            if debug:
+                print(f"[调试] 簇形成后: {len(cluster_heads)}个簇, {int(self._member_count.sum())}个成员")
             self._steady_state_communication()
-        else:
-            if self.round_number <= 5:
-                print(f"[调试] 轮{self.round_number}: 跳过数据传输")
+        elif debug:
+            print(f"[调试] 轮{self.round_number}: 跳过数据传输")
 
-        if self.round_number <= 5:
-            active_chs_after_comm = sum(1 for ch in self.cluster_heads if ch.is_alive)
-            print(f"[调试] 通信后活跃簇头: {active_chs_after_comm}")
+        if debug:
+            print(f"[调试] 通信后活跃簇头: {np.count_nonzero(self.is_ch & self.alive)}")
         
-        # 4. 更新轮数和统计
+        # 4. 更新轮数
         self.round_number += 1
-        round_stats = self._get_round_statistics()
-        self.stats['round_statistics'].append(round_stats)
 
-        return round_stats
+    def _tally(self) -> Tuple[int, float, int]:
+        """
+        一次汇总当前存活数、剩余总能量和活跃簇头数
+        存活数直接取自维护中的存活索引；直接统计活跃的簇头（而不是依赖self.cluster_heads列表）
+        """
+        alive_idx = self._alive_idx
+        return (alive_idx.size, sum(self.energy[alive_idx].tolist()),
+                int(self.is_ch[alive_idx].sum()))
+
+    def _record_round(self, r: int):
+        """把第r轮统计写入预分配记录数组"""
+        self._rs[r] = (self.round_number, *self._tally())
+        self._rounds_recorded = r + 1
     
     def _get_round_statistics(self) -> Dict:
         """获取当前轮的统计信息"""
-        alive_nodes = [node for node in self.nodes if node.is_alive]
-        total_remaining_energy = sum(node.current_energy for node in alive_nodes)
-
-        # 直接统计活跃的簇头（而不是依赖self.cluster_heads列表）
-        active_cluster_heads = [node for node in self.nodes if node.is_alive and node.is_cluster_head]
+        alive_count, total_remaining_energy, active_cluster_heads = self._tally()
 
         return {
             'round': self.round_number,
-            'alive_nodes': len(alive_nodes),
-            'cluster_heads': len(active_cluster_heads),
+            'alive_nodes': alive_count,
+            'cluster_heads': active_cluster_heads,
             'total_remaining_energy': total_remaining_energy,
-            'average_energy': total_remaining_energy / len(alive_nodes) if alive_nodes else 0,
-            'energy_consumed_this_round': self.config.num_nodes * self.config.initial_energy - total_remaining_energy - self.stats['total_energy_consumed']
+            'average_energy': total_remaining_energy / alive_count if alive_count else 0,
+            'energy_consumed_this_round': self._initial_total_energy - total_remaining_energy - self.stats['total_energy_consumed']
         }
     
     def run_simulation(self, max_rounds: int = 1000) -> Dict:
         """运行完整的LEACH仿真"""
-        
-        print(f">>> 开始LEACH协议仿真 (最大轮数: {max_rounds})")
+        verbose = self.verbose
+        if verbose:
+            print(f">>> 开始LEACH协议仿真 (最大轮数: {max_rounds})")
+
+        # 逐轮统计写入预分配的结构化记录数组，避免每轮构造字典
+        self._rs = np.zeros(max_rounds, dtype=self.ROUND_RECORD_DTYPE)
+        self._rounds_recorded = 0
         
         for round_num in range(max_rounds):
-            round_stats = self.run_round()
+            if self._alive_idx.size:
+                self._execute_round()
+            self._record_round(round_num)
             
             # 检查网络生存状态
-            if round_stats['alive_nodes'] == 0:
+            if self._rs['alive_nodes'][round_num] == 0:
                 self.stats['network_lifetime'] = round_num
-                print(f"[INFO] 网络在第 {round_num} 轮结束生命周期")
+                if verbose:
+                    print(f"[INFO] 网络在第 {round_num} 轮结束生命周期")
                 break
             
             # 每100轮输出一次进度
-            if round_num % 100 == 0:
-                print(f"   轮数 {round_num}: 存活节点 {round_stats['alive_nodes']}, "
-                      f"剩余能量 {round_stats['total_remaining_energy']:.3f}J")
+            if verbose and round_num % 100 == 0:
+                rec = self._rs[round_num]
+                print(_LEACH_PROGRESS(round_num, rec['alive_nodes'], rec['total_remaining_energy']))
         
         else:
             self.stats['network_lifetime'] = max_rounds
-            print(f"[SUCCESS] 仿真完成，网络在 {max_rounds} 轮后仍有节点存活")
+            if verbose:
+                print(f"[SUCCESS] 仿真完成，网络在 {max_rounds} 轮后仍有节点存活")
         
         return self.get_final_statistics()
     
+    def get_round_records(self) -> List[Dict]:
+        """run_simulation逐轮记录转换为字典列表 (兼容旧的round_statistics格式)"""
+        recorded = getattr(self, '_rounds_recorded', 0)
+        if not recorded:
+            return []
+        names = self._rs.dtype.names
+        return [dict(zip(names, row)) for row in self._rs[:recorded].tolist()]
+
+    def _average_round_stat(self, key: str) -> float:
+        """逐轮统计均值：run_simulation的记录数组与run_round的累加和合并计算"""
+        recorded = getattr(self, '_rounds_recorded', 0)
+        count = len(self.stats['round_statistics']) + recorded
+        if not count:
+            return 0
+        total = self._round_stat_sums[key]
+        if recorded:
+            total += self._rs[key][:recorded].sum()
+        return total / count
+
     def get_final_statistics(self) -> Dict:
         """获取最终统计结果"""
-        alive_nodes = [node for node in self.nodes if node.is_alive]
-        
         final_stats = {
             'protocol': 'LEACH',
             'network_lifetime': self.stats['network_lifetime'],
             'total_energy_consumed': self.stats['total_energy_consumed'],
-            'final_alive_nodes': len(alive_nodes),
+            'final_alive_nodes': int(self.alive.sum()),
             'energy_efficiency': self.stats['packets_transmitted'] / self.stats['total_energy_consumed'] if self.stats['total_energy_consumed'] > 0 else 0,
             'packet_delivery_ratio': self.stats['packets_received'] / self.stats['packets_transmitted'] if self.stats['packets_transmitted'] > 0 else 0,
-            'average_cluster_heads_per_round': np.mean([r.get('cluster_heads', 0) for r in self.stats['round_statistics']]) if self.stats['round_statistics'] else 0,
+            'average_cluster_heads_per_round': self._average_round_stat('cluster_heads'),
             'additional_metrics': {
                 'total_packets_sent': self.stats['packets_transmitted'],
                 'total_packets_received': self.stats['packets_received']
@@ -371,14 +710,34 @@ class PEGASISProtocol:
     Power-Efficient Gathering in Sensor Information Systems
     """
 
-    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel):
+    # run_simulation逐轮记录的字段 (与run_round返回字典的键同名)
+    ROUND_RECORD_DTYPE = np.dtype([('round', 'i4'), ('alive_nodes', 'i4'),
+                                   ('total_remaining_energy', 'f8'), ('chain_length', 'i4')])
+
+    # run_simulation是否输出开始/进度/结束信息 (批量仿真时设为False)
+    verbose = True
+
+    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel,
+                 seed: Optional[int] = None):
         self.config = config
         self.energy_model = energy_model
         self.nodes = []
         self.round_number = 0
-        self.chain = []  # 节点链
+        self.chain_ids = np.empty(0, dtype=np.int64)  # 节点链 (按链顺序的节点id)
         self.leader_index = 0  # 当前领导者在链中的索引
 
+        # 能耗模型常数：链上逐跳 (0 dBm) 与领导者到基站 (5 dBm)
+        self._bits = config.packet_size * 8
+        self._radio = RadioConstants.from_model(energy_model, self._bits)
+        self._radio_bs = RadioConstants.from_model(energy_model, self._bits, tx_power_dbm=5.0)
+        self._tx_batch = functools.partial(energy_model.calculate_transmission_energy_batch, self._bits)
+        # 领导者聚合能耗 (PEGASIS聚合复杂度较低)
+        self._aggregation_energy = functools.partial(energy_model.calculate_processing_energy,
+                                                     processing_complexity=1.2)
+
+        # 网络初始总能量，逐轮统计本轮能耗时直接使用
+        self._initial_total_energy = config.num_nodes * config.initial_energy
+
         # 性能统计
         self.stats = {
             'network_lifetime': 0,
@@ -388,211 +747,223 @@ class PEGASISProtocol:
             'chain_construction_overhead': 0,
             'round_statistics': []
         }
+        # run_round返回的逐轮统计按记录字段累加，求均值时无需再遍历round_statistics
+        self._round_stat_sums = dict.fromkeys(self.ROUND_RECORD_DTYPE.names, 0)
+
+        # 协议私有随机数生成器 (节点部署)，未指定seed时由全局random派生
+        self._rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
 
         self._initialize_network()
         self._construct_chain()
 
     def _initialize_network(self):
-        """初始化网络节点"""
-        self.nodes = []
-        for i in range(self.config.num_nodes):
-            x = random.uniform(0, self.config.area_width)
-            y = random.uniform(0, self.config.area_height)
-            node = Node(
-                id=i,
-                x=x,
-                y=y,
-                initial_energy=self.config.initial_energy,
-                current_energy=self.config.initial_energy
-            )
-            self.nodes.append(node)
+        """初始化网络节点 (SoA数组存储，self.nodes为NodeView视图)"""
+        _init_node_arrays(self, self.config)
+
+        self._views = list(self.nodes)
+        # 存活计数：节点只在数据收集阶段死亡，该阶段结束时刷新一次
+        self._alive_count = self.config.num_nodes
+
+        # 到基站距离 (节点静止，按节点id索引)
+        self.d_to_bs = np.hypot(self.pos[:, 0] - self.config.base_station_x,
+                                self.pos[:, 1] - self.config.base_station_y)
+        # 节点间距离矩阵，跨轮次复用
+        self.D = cdist(self.pos, self.pos)
 
     def _calculate_distance(self, node1: Node, node2: Node) -> float:
-        """计算两节点间距离"""
-        return math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+        """两节点间距离 (查距离矩阵)"""
+        return float(self.D[node1.id, node2.id])
 
     def _calculate_distance_to_bs(self, node: Node) -> float:
-        """计算节点到基站距离"""
-        return math.sqrt((node.x - self.config.base_station_x)**2 +
-                        (node.y - self.config.base_station_y)**2)
+        """节点到基站距离 (查预计算表)"""
+        return float(self.d_to_bs[node.id])
+
+    @property
+    def chain(self) -> List[Node]:
+        """链上节点视图 (兼容旧接口，内部使用chain_ids)"""
+        return [self._views[i] for i in self.chain_ids.tolist()]
+
+    @chain.setter
+    def chain(self, nodes: List[Node]):
+        self.chain_ids = np.array([n.id for n in nodes], dtype=np.int64)
 
     def _construct_chain(self):
         """
         构建PEGASIS链
         使用贪心算法构建最短路径链
         """
-        if not self.nodes:
-            return
-
-        # 从距离基站最远的节点开始
-        remaining_nodes = [node for node in self.nodes if node.is_alive]
-        if not remaining_nodes:
+        # 从距离基站最远的节点开始 (存活掩码直接得到按id升序的存活节点)
+        alive_ids = np.flatnonzero(self.alive)
+        if not alive_ids.size:
             return
 
         # 找到距离基站最远的节点作为起始点
-        start_node = max(remaining_nodes,
-                        key=lambda n: self._calculate_distance_to_bs(n))
-
-        self.chain = [start_node]
-        remaining_nodes.remove(start_node)
+        cur_pos = int(self.d_to_bs[alive_ids].argmax())
 
         # 贪心算法构建链：每次选择距离当前链端最近的节点
-        while remaining_nodes:
-            current_end = self.chain[-1]
-
-            # 找到距离链尾最近的节点
-            nearest_node = min(remaining_nodes,
-                             key=lambda n: self._calculate_distance(current_end, n))
-
-            self.chain.append(nearest_node)
-            remaining_nodes.remove(nearest_node)
+        if NUMBA_AVAILABLE:
+            chain_pos = _pegasis_chain(self.D, alive_ids.astype(np.int64, copy=False), cur_pos)
+        else:
+            # 在距离矩阵行上做掩码argmin，避免逐对计算距离和list.remove
+            unvisited = np.ones(alive_ids.size, dtype=bool)
+            unvisited[cur_pos] = False
+            chain_pos = [cur_pos]
+            for _ in range(alive_ids.size - 1):
+                row = self.D[alive_ids[cur_pos], alive_ids]
+                row[~unvisited] = np.inf
+                cur_pos = int(row.argmin())
+                unvisited[cur_pos] = False
+                chain_pos.append(cur_pos)
+
+        self.chain_ids = alive_ids[chain_pos].astype(np.int64)
 
         # 初始化领导者为链中间的节点
-        self.leader_index = len(self.chain) // 2
+        self.leader_index = len(self.chain_ids) // 2
 
     def _update_chain(self):
         """更新链结构，移除死亡节点"""
-        # 移除死亡节点
-        alive_chain = [node for node in self.chain if node.is_alive]
+        # 链由全部存活节点构成：存活数与链长相同说明上轮无节点死亡，链保持不变
+        if self._alive_count == len(self.chain_ids):
+            return
+
+        # 移除死亡节点 (存活掩码直接筛选链上id)
+        mask = self.alive[self.chain_ids]
+        new_len = int(mask.sum())
 
-        if not alive_chain:
-            self.chain = []
+        if new_len == 0:
+            self.chain_ids = self.chain_ids[:0]
             return
 
         # 如果链结构发生重大变化，重新构建
-        if len(alive_chain) < len(self.chain) * 0.8:
+        if new_len < len(self.chain_ids) * 0.8:
             self.nodes = [node for node in self.nodes if node.is_alive]
             self._construct_chain()
         else:
-            self.chain = alive_chain
+            self.chain_ids = self.chain_ids[mask]
             # 调整领导者索引
-            if self.leader_index >= len(self.chain):
-                self.leader_index = len(self.chain) // 2
+            if self.leader_index >= new_len:
+                self.leader_index = new_len // 2
 
     def _data_gathering_phase(self):
         """数据收集阶段"""
-        if not self.chain or len(self.chain) < 2:
+        chain_len = len(self.chain_ids)
+        if chain_len < 2:
             return
 
         total_energy_consumed = 0.0
         packets_transmitted = 0
         packets_received = 0
 
-        leader = self.chain[self.leader_index]
+        leader = self._views[int(self.chain_ids[self.leader_index])]
 
-        # 从链的两端向领导者传输数据
-        # 左侧链传输
-        for i in range(self.leader_index):
-            current_node = self.chain[i]
-            next_node = self.chain[i + 1]
+        # 从链的两端向领导者传输数据，领导者再向基站发送
+        if NUMBA_AVAILABLE:
+            energy, tx_count, rx_count = self._gather_chain_jit(self._leader_cost(leader, chain_len))
+            total_energy_consumed += energy
+            packets_transmitted += tx_count
+            packets_received += rx_count
+        else:
+            chain = self.chain
+            chain_ids = self.chain_ids
+
+            # 链上各跳发送能耗一次批量算出
+            hop_tx = self._tx_batch(self.D[chain_ids[:-1], chain_ids[1:]])
+            rx_energy = self._radio.rx
+
+            # 左右两侧链合并为一个发送序列: 先 0->leader，再 n-1->leader
+            # 第k跳由链位置senders[k]发往receivers[k]，两侧跳号均为较小的链位置
+            left = np.arange(self.leader_index)
+            right = np.arange(chain_len - 1, self.leader_index, -1)
+            senders = np.concatenate([left, right]).tolist()
+            receivers = np.concatenate([left + 1, right - 1]).tolist()
+            tx_seq = hop_tx[np.concatenate([left, right - 1])].tolist()
+
+            # 节点死亡会影响后续跳，故仍逐跳顺序结算
+            for src, dst, tx_energy in zip(senders, receivers, tx_seq):
+                current_node = chain[src]
+                next_node = chain[dst]
+
+                if not current_node.is_alive or not next_node.is_alive:
+                    continue
 
-            if not current_node.is_alive or not next_node.is_alive:
-                continue
+                # 更新节点能量
+                current_node.current_energy -= tx_energy
+                next_node.current_energy -= rx_energy
 
-            # 计算传输距离
-            distance = self._calculate_distance(current_node, next_node)
-
-            # 计算传输和接收能耗
-            tx_energy = self.energy_model.calculate_transmission_energy(
-                self.config.packet_size * 8,
-                distance
-            )
-            rx_energy = self.energy_model.calculate_reception_energy(
-                self.config.packet_size * 8
-            )
-
-            # 更新节点能量
-            current_node.current_energy -= tx_energy
-            next_node.current_energy -= rx_energy
-
-            total_energy_consumed += (tx_energy + rx_energy)
-            packets_transmitted += 1
-            packets_received += 1
-
-            # 检查节点生存状态
-            if current_node.current_energy <= 0:
-                current_node.is_alive = False
-                current_node.current_energy = 0
-            if next_node.current_energy <= 0:
-                next_node.is_alive = False
-                next_node.current_energy = 0
-
-        # 右侧链传输
-        for i in range(len(self.chain) - 1, self.leader_index, -1):
-            current_node = self.chain[i]
-            next_node = self.chain[i - 1]
-
-            if not current_node.is_alive or not next_node.is_alive:
-                continue
+                total_energy_consumed += (tx_energy + rx_energy)
+                packets_transmitted += 1
+                packets_received += 1
+
+                # 检查节点生存状态
+                if current_node.current_energy <= 0:
+                    current_node.is_alive = False
+                    current_node.current_energy = 0
+                if next_node.current_energy <= 0:
+                    next_node.is_alive = False
+                    next_node.current_energy = 0
+
+            # 领导者向基站传输聚合数据
+            if leader.is_alive:
+                leader_cost = self._leader_cost(leader, chain_len)
+
+                # 更新领导者能量
+                leader.current_energy -= leader_cost
+                total_energy_consumed += leader_cost
+                packets_transmitted += 1
 
-            # 计算传输距离
-            distance = self._calculate_distance(current_node, next_node)
-
-            # 计算传输和接收能耗
-            tx_energy = self.energy_model.calculate_transmission_energy(
-                self.config.packet_size * 8,
-                distance
-            )
-            rx_energy = self.energy_model.calculate_reception_energy(
-                self.config.packet_size * 8
-            )
-
-            # 更新节点能量
-            current_node.current_energy -= tx_energy
-            next_node.current_energy -= rx_energy
-
-            total_energy_consumed += (tx_energy + rx_energy)
-            packets_transmitted += 1
-            packets_received += 1
-
-            # 检查节点生存状态
-            if current_node.current_energy <= 0:
-                current_node.is_alive = False
-                current_node.current_energy = 0
-            if next_node.current_energy <= 0:
-                next_node.is_alive = False
-                next_node.current_energy = 0
-
-        # 领导者向基站传输聚合数据
-        if leader.is_alive:
-            distance_to_bs = self._calculate_distance_to_bs(leader)
-
-            # 计算传输能耗
-            tx_energy = self.energy_model.calculate_transmission_energy(
-                self.config.packet_size * 8,
-                distance_to_bs,
-                tx_power_dbm=5.0  # 向基站传输使用更高功率
-            )
-
-            # 数据聚合处理能耗
-            processing_energy = self.energy_model.calculate_processing_energy(
-                self.config.packet_size * 8 * len(self.chain),
-                processing_complexity=1.2  # PEGASIS聚合复杂度较低
-            )
-
-            # 更新领导者能量
-            leader.current_energy -= (tx_energy + processing_energy)
-            total_energy_consumed += (tx_energy + processing_energy)
-            packets_transmitted += 1
-
-            # 检查领导者生存状态
-            if leader.current_energy <= 0:
-                leader.is_alive = False
-                leader.current_energy = 0
+                # 检查领导者生存状态
+                if leader.current_energy <= 0:
+                    leader.is_alive = False
+                    leader.current_energy = 0
 
         # 更新统计信息
         self.stats['total_energy_consumed'] += total_energy_consumed
         self.stats['packets_transmitted'] += packets_transmitted
         self.stats['packets_received'] += packets_received
+        self._alive_count = int(self.alive.sum())
+
+    def _leader_cost(self, leader: Node, chain_len: int) -> float:
+        """领导者向基站发送 (5 dBm) 与聚合链上数据的总能耗"""
+        tx_energy = self._radio_bs.tx(self._calculate_distance_to_bs(leader))
+        processing_energy = self._aggregation_energy(self._bits * chain_len)
+        return tx_energy + processing_energy
+
+    def _gather_chain_jit(self, leader_cost: float) -> Tuple[float, int, int]:
+        """用Numba内核完成整个数据收集阶段，并把能量/存活状态写回SoA数组"""
+        chain_ids = self.chain_ids
+        hop = self.D[chain_ids[:-1], chain_ids[1:]]
+        energy = self.energy[chain_ids]
+        alive = self.alive[chain_ids]
+
+        rc = self._radio
+        total, n_tx, n_rx = _pegasis_gather(
+            hop, energy, alive, self.leader_index,
+            rc.base_tx, rc.amp_coef, float(rc.bits), float(rc.d_threshold),
+            rc.temp_factor, rc.humidity_factor, rc.rx, leader_cost
+        )
+
+        self.energy[chain_ids] = energy
+        self.alive[chain_ids] = alive
+        return total, n_tx, n_rx
 
     def run_round(self) -> Dict:
-        """运行一轮PEGASIS协议"""
+        """运行一轮PEGASIS协议并返回本轮统计 (对外接口)"""
 
         # 检查网络是否还有活跃节点
-        alive_nodes = [node for node in self.nodes if node.is_alive]
-        if not alive_nodes:
+        if not self._alive_count:
             return self._get_round_statistics()
 
+        self._execute_round()
+        round_stats = self._get_round_statistics()
+        self.stats['round_statistics'].append(round_stats)
+        for key in self._round_stat_sums:
+            self._round_stat_sums[key] += round_stats[key]
+
+        return round_stats
+
+    def _execute_round(self):
+        """执行一轮PEGASIS协议，不生成统计字典"""
+
         # 1. 更新链结构 (移除死亡节点)
         self._update_chain()
 
@@ -600,71 +971,102 @@ class PEGASISProtocol:
         self._data_gathering_phase()
 
         # 3. 轮换领导者
-        if self.chain:
-            self.leader_index = (self.leader_index + 1) % len(self.chain)
+        if len(self.chain_ids):
+            self.leader_index = (self.leader_index + 1) % len(self.chain_ids)
 
         # 4. 更新轮数
         self.round_number += 1
 
-        # 5. 记录本轮统计
-        round_stats = self._get_round_statistics()
-        self.stats['round_statistics'].append(round_stats)
+    def _tally(self) -> Tuple[int, float]:
+        """一次汇总当前存活数和剩余总能量"""
+        if NUMBA_AVAILABLE:
+            return _alive_energy(self.energy, self.alive)
+        return self._alive_count, sum(self.energy[self.alive].tolist())
 
-        return round_stats
+    def _record_round(self, r: int):
+        """把第r轮统计写入预分配记录数组"""
+        self._rs[r] = (self.round_number, *self._tally(), len(self.chain_ids))
+        self._rounds_recorded = r + 1
 
     def _get_round_statistics(self) -> Dict:
         """获取当前轮的统计信息"""
-        alive_nodes = [node for node in self.nodes if node.is_alive]
-        total_remaining_energy = sum(node.current_energy for node in alive_nodes)
+        alive_count, total_remaining_energy = self._tally()
 
         return {
             'round': self.round_number,
-            'alive_nodes': len(alive_nodes),
-            'chain_length': len(self.chain),
-            'leader_id': self.chain[self.leader_index].id if self.chain else -1,
+            'alive_nodes': alive_count,
+            'chain_length': len(self.chain_ids),
+            'leader_id': int(self.chain_ids[self.leader_index]) if len(self.chain_ids) else -1,
             'total_remaining_energy': total_remaining_energy,
-            'average_energy': total_remaining_energy / len(alive_nodes) if alive_nodes else 0,
-            'energy_consumed_this_round': self.config.num_nodes * self.config.initial_energy - total_remaining_energy - self.stats['total_energy_consumed']
+            'average_energy': total_remaining_energy / alive_count if alive_count else 0,
+            'energy_consumed_this_round': self._initial_total_energy - total_remaining_energy - self.stats['total_energy_consumed']
         }
 
     def run_simulation(self, max_rounds: int = 1000) -> Dict:
         """运行完整的PEGASIS仿真"""
 
-        print(f">>> 开始PEGASIS协议仿真 (最大轮数: {max_rounds})")
+        verbose = self.verbose
+        if verbose:
+            print(f">>> 开始PEGASIS协议仿真 (最大轮数: {max_rounds})")
+
+        # 逐轮统计写入预分配的结构化记录数组，避免每轮构造字典
+        self._rs = np.zeros(max_rounds, dtype=self.ROUND_RECORD_DTYPE)
+        self._rounds_recorded = 0
 
         for round_num in range(max_rounds):
-            round_stats = self.run_round()
+            if self._alive_count:
+                self._execute_round()
+            self._record_round(round_num)
 
             # 检查网络生存状态
-            if round_stats['alive_nodes'] == 0:
+            if self._rs['alive_nodes'][round_num] == 0:
                 self.stats['network_lifetime'] = round_num
-                print(f"[INFO] 网络在第 {round_num} 轮结束生命周期")
+                if verbose:
+                    print(f"[INFO] 网络在第 {round_num} 轮结束生命周期")
                 break
 
             # 每100轮输出一次进度
-            if round_num % 100 == 0:
-                print(f"   轮数 {round_num}: 存活节点 {round_stats['alive_nodes']}, "
-                      f"剩余能量 {round_stats['total_remaining_energy']:.3f}J, "
-                      f"链长度 {round_stats['chain_length']}")
+            if verbose and round_num % 100 == 0:
+                rec = self._rs[round_num]
+                print(_PEGASIS_PROGRESS(round_num, rec['alive_nodes'],
+                                        rec['total_remaining_energy'], rec['chain_length']))
 
         else:
             self.stats['network_lifetime'] = max_rounds
-            print(f"[SUCCESS] 仿真完成，网络在 {max_rounds} 轮后仍有节点存活")
+            if verbose:
+                print(f"[SUCCESS] 仿真完成，网络在 {max_rounds} 轮后仍有节点存活")
 
         return self.get_final_statistics()
 
+    def get_round_records(self) -> List[Dict]:
+        """run_simulation逐轮记录转换为字典列表 (兼容旧的round_statistics格式)"""
+        recorded = getattr(self, '_rounds_recorded', 0)
+        if not recorded:
+            return []
+        names = self._rs.dtype.names
+        return [dict(zip(names, row)) for row in self._rs[:recorded].tolist()]
+
+    def _average_round_stat(self, key: str) -> float:
+        """逐轮统计均值：run_simulation的记录数组与run_round的累加和合并计算"""
+        recorded = getattr(self, '_rounds_recorded', 0)
+        count = len(self.stats['round_statistics']) + recorded
+        if not count:
+            return 0
+        total = self._round_stat_sums[key]
+        if recorded:
+            total += self._rs[key][:recorded].sum()
+        return total / count
+
     def get_final_statistics(self) -> Dict:
         """获取最终统计结果"""
-        alive_nodes = [node for node in self.nodes if node.is_alive]
-
         final_stats = {
             'protocol': 'PEGASIS',
             'network_lifetime': self.stats['network_lifetime'],
             'total_energy_consumed': self.stats['total_energy_consumed'],
-            'final_alive_nodes': len(alive_nodes),
+            'final_alive_nodes': int(self.alive.sum()),
             'energy_efficiency': self.stats['packets_transmitted'] / self.stats['total_energy_consumed'] if self.stats['total_energy_consumed'] > 0 else 0,
             'packet_delivery_ratio': self.stats['packets_received'] / self.stats['packets_transmitted'] if self.stats['packets_transmitted'] > 0 else 0,
-            'average_chain_length': np.mean([r.get('chain_length', 0) for r in self.stats['round_statistics']]) if self.stats['round_statistics'] else 0,
+            'average_chain_length': self._average_round_stat('chain_length'),
             'additional_metrics': {
                 'total_packets_sent': self.stats['packets_transmitted'],
                 'total_packets_received': self.stats['packets_received']
@@ -679,13 +1081,60 @@ class PEGASISProtocol:
 
         return final_stats
 
-# 测试函数
-class HEEDProtocolWrapper:
-    """HEED协议包装类，使其与基准测试框架兼容"""
+def _uniform_positions(rng: np.random.Generator, config: NetworkConfig) -> List[Tuple[float, float]]:
+    """在部署区域内均匀生成全部节点坐标，返回initialize_network所需的(x, y)列表"""
+    pos = rng.uniform((0.0, 0.0), (config.area_width, config.area_height),
+                      size=(config.num_nodes, 2))
+    return list(map(tuple, pos.tolist()))
 
-    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel):
+class _WrappedProtocol:
+    """
+    外部协议包装基类 (HEED/TEEN)，使其与基准测试框架兼容
+    统一节点部署和结果格式，子类只需创建内层协议 self._inner 并实现 _run_inner
+    """
+
+    protocol_name = ''
+    # 结果中直接取自内层协议最终统计的字段 (按输出顺序)
+    _RESULT_KEYS = ('network_lifetime', 'total_energy_consumed', 'packets_transmitted',
+                    'packets_received', 'packet_delivery_ratio', 'energy_efficiency',
+                    'final_alive_nodes')
+
+    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel,
+                 seed: Optional[int] = None):
         self.config = config
         self.energy_model = energy_model
+        # 节点部署用私有随机数生成器，未指定seed时由全局random派生
+        self._rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+
+    def _run_inner(self, max_rounds: int) -> Tuple[Dict, float]:
+        """运行内层协议，返回 (最终统计, 平均每轮簇头数)"""
+        raise NotImplementedError
+
+    def run_simulation(self, max_rounds: int = 200) -> Dict:
+        """运行协议仿真"""
+        # 生成节点位置 (一次生成全部坐标)，初始化网络
+        node_positions = _uniform_positions(self._rng, self.config)
+        self._inner.initialize_network(node_positions)
+
+        final_stats, avg_cluster_heads = self._run_inner(max_rounds)
+
+        # 返回与其他协议兼容的结果格式
+        results = {'protocol': self.protocol_name}
+        for key in self._RESULT_KEYS:
+            results[key] = final_stats[key]
+        results['average_cluster_heads_per_round'] = avg_cluster_heads
+        results['additional_metrics'] = final_stats['additional_metrics']
+        return results
+
+# 测试函数
+class HEEDProtocolWrapper(_WrappedProtocol):
+    """HEED协议包装类，使其与基准测试框架兼容"""
+
+    protocol_name = 'HEED'
+
+    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel,
+                 seed: Optional[int] = None):
+        super().__init__(config, energy_model, seed)
 
         # 创建HEED配置
         self.heed_config = HEEDConfig(
@@ -701,61 +1150,35 @@ class HEEDProtocolWrapper:
             base_station_y=config.base_station_y
         )
 
-        self.heed_protocol = HEEDProtocol(self.heed_config)
-        self.round_stats = []
+        self.heed_protocol = self._inner = HEEDProtocol(self.heed_config)
+        # 逐轮簇头数累加器 (只用于求平均簇头数，不保存逐轮统计字典)
+        self._ch_sum = 0
+        self._rounds = 0
 
-    def run_simulation(self, max_rounds: int = 200) -> Dict:
-        """运行HEED协议仿真"""
-        # 生成节点位置
-        node_positions = []
-        for _ in range(self.config.num_nodes):
-            x = random.uniform(0, self.config.area_width)
-            y = random.uniform(0, self.config.area_height)
-            node_positions.append((x, y))
-
-        # 初始化网络
-        self.heed_protocol.initialize_network(node_positions)
-
-        # 运行仿真
+    def _run_inner(self, max_rounds: int) -> Tuple[Dict, float]:
+        """逐轮运行HEED，累加每轮簇头数"""
         round_num = 0
         while round_num < max_rounds:
             if not self.heed_protocol.run_round():
                 break
 
-            # 记录统计信息
-            stats = self.heed_protocol.get_statistics()
-            self.round_stats.append(stats)
+            # 累加本轮簇头数 (与get_statistics()['cluster_heads']长度一致)
+            self._ch_sum += len(self.heed_protocol.clusters)
+            self._rounds += 1
             round_num += 1
 
-        # 计算最终统计
-        final_stats = self.heed_protocol.get_final_statistics()
-
         # 计算平均簇头数
-        avg_cluster_heads = 0
-        if self.round_stats:
-            total_clusters = sum(len(stats.get('cluster_heads', [])) for stats in self.round_stats)
-            avg_cluster_heads = total_clusters / len(self.round_stats)
+        avg_cluster_heads = self._ch_sum / self._rounds if self._rounds else 0
+        return self.heed_protocol.get_final_statistics(), avg_cluster_heads
 
-        # 返回与其他协议兼容的结果格式
-        return {
-            'protocol': 'HEED',
-            'network_lifetime': final_stats['network_lifetime'],
-            'total_energy_consumed': final_stats['total_energy_consumed'],
-            'packets_transmitted': final_stats['packets_transmitted'],
-            'packets_received': final_stats['packets_received'],
-            'packet_delivery_ratio': final_stats['packet_delivery_ratio'],
-            'energy_efficiency': final_stats['energy_efficiency'],
-            'final_alive_nodes': final_stats['final_alive_nodes'],
-            'average_cluster_heads_per_round': avg_cluster_heads,
-            'additional_metrics': final_stats['additional_metrics']
-        }
-
-class TEENProtocolWrapper:
+class TEENProtocolWrapper(_WrappedProtocol):
     """TEEN协议包装类，使其与基准测试框架兼容"""
 
-    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel):
-        self.config = config
-        self.energy_model = energy_model
+    protocol_name = 'TEEN'
+
+    def __init__(self, config: NetworkConfig, energy_model: ImprovedEnergyModel,
+                 seed: Optional[int] = None):
+        super().__init__(config, energy_model, seed)
 
         # 创建TEEN配置 - 使用修复后的优化参数
         self.teen_config = TEENConfig(
@@ -773,54 +1196,58 @@ class TEENProtocolWrapper:
             cluster_head_percentage=0.08  # 修复后：增加簇头比例
         )
 
-        self.teen_protocol = TEENProtocol(self.teen_config)
-        self.round_stats = []
+        self.teen_protocol = self._inner = TEENProtocol(self.teen_config)
 
-    def run_simulation(self, max_rounds: int = 200) -> Dict:
-        """运行TEEN协议仿真"""
-        # 生成节点位置
-        node_positions = []
-        for _ in range(self.config.num_nodes):
-            x = random.uniform(0, self.config.area_width)
-            y = random.uniform(0, self.config.area_height)
-            node_positions.append((x, y))
-
-        # 初始化网络
-        self.teen_protocol.initialize_network(node_positions)
-
-        # 运行仿真
+    def _run_inner(self, max_rounds: int) -> Tuple[Dict, float]:
+        """TEEN自带完整仿真循环，直接使用其结果"""
         results = self.teen_protocol.run_simulation(max_rounds)
+        return results, results['average_cluster_heads_per_round']
+
+def _run_single_seed(job: Tuple) -> Dict:
+    """进程池工作函数：按给定种子独立运行一次仿真 (屏蔽进度输出)"""
+    protocol_cls, config, energy_model, seed, max_rounds = job
+    with contextlib.redirect_stdout(io.StringIO()):
+        protocol = protocol_cls(config, energy_model, seed=seed)
+        protocol.verbose = False
+        return protocol.run_simulation(max_rounds)
+
+def run_simulation_batch(protocol_cls, config: NetworkConfig, energy_model: ImprovedEnergyModel,
+                         seeds: List[int], max_rounds: int = 1000,
+                         max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    多种子并行仿真 (LEACHProtocol / PEGASISProtocol)
+    每个种子在独立进程中运行，结果按seeds顺序返回；max_workers=1时串行执行
+    """
+    jobs = [(protocol_cls, config, energy_model, seed, max_rounds) for seed in seeds]
+    if max_workers == 1 or len(jobs) <= 1:
+        return [_run_single_seed(job) for job in jobs]
 
-        # 返回与其他协议兼容的结果格式
-        return {
-            'protocol': 'TEEN',
-            'network_lifetime': results['network_lifetime'],
-            'total_energy_consumed': results['total_energy_consumed'],
-            'packets_transmitted': results['packets_transmitted'],
-            'packets_received': results['packets_received'],
-            'packet_delivery_ratio': results['packet_delivery_ratio'],
-            'energy_efficiency': results['energy_efficiency'],
-            'final_alive_nodes': results['final_alive_nodes'],
-            'average_cluster_heads_per_round': results['average_cluster_heads_per_round'],
-            'additional_metrics': results['additional_metrics']
-        }
-
-def test_leach_protocol():
-    """测试LEACH协议实现"""
-
-    print("[TEST] 测试LEACH协议标准实现")
-    print("=" * 50)
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        return list(executor.map(_run_single_seed, jobs))
 
-    # 创建网络配置
+@functools.lru_cache(maxsize=None)
+def _default_test_setup() -> Tuple[NetworkConfig, ImprovedEnergyModel]:
+    """
+    各test_*_protocol共用的网络配置与能耗模型，首次调用时构造一次
+    协议只读取二者，不会修改，可安全共享
+    """
     config = NetworkConfig(
         num_nodes=50,
         initial_energy=2.0,
         area_width=100,
         area_height=100
     )
-
-    # 创建能耗模型
     energy_model = ImprovedEnergyModel(HardwarePlatform.CC2420_TELOSB)
+    return config, energy_model
+
+def test_leach_protocol():
+    """测试LEACH协议实现"""
+
+    print("[TEST] 测试LEACH协议标准实现")
+    print("=" * 50)
+
+    # 共享的网络配置与能耗模型
+    config, energy_model = _default_test_setup()
 
     # 创建LEACH协议实例
     leach = LEACHProtocol(config, energy_model)
@@ -843,16 +1270,8 @@ def test_pegasis_protocol():
     print("\n[TEST] 测试PEGASIS协议标准实现")
     print("=" * 50)
 
-    # 创建网络配置
-    config = NetworkConfig(
-        num_nodes=50,
-        initial_energy=2.0,
-        area_width=100,
-        area_height=100
-    )
-
-    # 创建能耗模型
-    energy_model = ImprovedEnergyModel(HardwarePlatform.CC2420_TELOSB)
+    # 共享的网络配置与能耗模型
+    config, energy_model = _default_test_setup()
 
     # 创建PEGASIS协议实例
     pegasis = PEGASISProtocol(config, energy_model)
@@ -875,16 +1294,8 @@ def test_heed_protocol():
     print("\n[TEST] 测试HEED协议标准实现")
     print("=" * 50)
 
-    # 创建网络配置
-    config = NetworkConfig(
-        num_nodes=50,
-        initial_energy=2.0,
-        area_width=100,
-        area_height=100
-    )
-
-    # 创建能耗模型
-    energy_model = ImprovedEnergyModel(HardwarePlatform.CC2420_TELOSB)
+    # 共享的网络配置与能耗模型
+    config, energy_model = _default_test_setup()
 
     # 创建HEED协议实例
     heed = HEEDProtocolWrapper(config, energy_model)
@@ -907,16 +1318,8 @@ def test_teen_protocol():
     print("\n[TEST] 测试TEEN协议标准实现")
     print("=" * 50)
 
-    # 创建网络配置
-    config = NetworkConfig(
-        num_nodes=50,
-        initial_energy=2.0,
-        area_width=100,
-        area_height=100
-    )
-
-    # 创建能耗模型
-    energy_model = ImprovedEnergyModel(HardwarePlatform.CC2420_TELOSB)
+    # 共享的网络配置与能耗模型
+    config, energy_model = _default_test_setup()
 
     # 创建TEEN协议实例
     teen = TEENProtocolWrapper(config, energy_model)
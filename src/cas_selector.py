@@ -30,6 +30,10 @@ class CASMode(str, Enum):
     TWO_HOP = "two_hop"    # Members -> relay (closer to CH) -> CH
 
 
+# Fixed mode order used for score vectors (index -> mode)
+_MODES = (CASMode.DIRECT, CASMode.CHAIN, CASMode.TWO_HOP)
+
+
 @dataclass
 class CASConfig:
     # Feature normalization guards
@@ -81,6 +85,8 @@ class CASConfig:
 
 
 class CASSelector:
+    _FEATURE_KEYS = ("energy", "link", "dist_bs", "radius", "density", "fairness")
+
     def __init__(self, config: Optional[CASConfig] = None):
         self.cfg = config or CASConfig()
         self._ema_scores: Dict[CASMode, float] = {
@@ -90,10 +96,6 @@ class CASSelector:
         }
         self._last_mode: Optional[CASMode] = None
 
-    @staticmethod
-    def _clip01(x: float) -> float:
-        return 0.0 if math.isnan(x) else max(0.0, min(1.0, x))
-
     def _score_direct(self, f: Dict[str, float]) -> float:
         c = self.cfg
         return (
@@ -143,51 +145,57 @@ class CASSelector:
         features keys: energy, link, dist_bs, radius, density, fairness, tail_max(optional)
         Returns: (mode, confidence, scores)
         """
-        # Guard & clip
-        f = {k: self._clip01(float(features.get(k, 0.0))) for k in [
-            "energy", "link", "dist_bs", "radius", "density", "fairness"
-        ]}
-        f["tail_max"] = self._clip01(float(features.get("tail_max", 0.0)))
-
-        s_direct = self._ema_update(CASMode.DIRECT, self._score_direct(f))
-        s_chain  = self._ema_update(CASMode.CHAIN,  self._score_chain(f))
-        s_twohop = self._ema_update(CASMode.TWO_HOP, self._score_twohop(f))
-
-        scores = {
-            CASMode.DIRECT: s_direct,
-            CASMode.CHAIN: s_chain,
-            CASMode.TWO_HOP: s_twohop,
-        }
+        # Guard & clip (NaN -> 0, clamp to [0,1]; inlined to avoid a call per feature)
+        f = {}
+        for k in self._FEATURE_KEYS:
+            v = float(features.get(k, 0.0))
+            f[k] = 0.0 if (v != v or v <= 0.0) else (1.0 if v > 1.0 else v)
+        v = float(features.get("tail_max", 0.0))
+        f["tail_max"] = 0.0 if (v != v or v <= 0.0) else (1.0 if v > 1.0 else v)
+
+        # Scores kept as a list in _MODES order
+        scores = [
+            self._ema_update(CASMode.DIRECT, self._score_direct(f)),
+            self._ema_update(CASMode.CHAIN, self._score_chain(f)),
+            self._ema_update(CASMode.TWO_HOP, self._score_twohop(f)),
+        ]
 
         # Uncertainty penalty: penalize riskier modes under high variance
-        mean_f = (f["energy"] + f["link"] + f["dist_bs"] + f["radius"] + f["density"]) / 5.0
+        # (population variance of the first five features, read from the dict once)
+        energy, link, dist_bs, radius, density = (
+            f["energy"], f["link"], f["dist_bs"], f["radius"], f["density"]
+        )
+        mean_f = (energy + link + dist_bs + radius + density) / 5.0
         var_proxy = (
-            (f["energy"] - mean_f) ** 2 +
-            (f["link"] - mean_f) ** 2 +
-            (f["dist_bs"] - mean_f) ** 2 +
-            (f["radius"] - mean_f) ** 2 +
-            (f["density"] - mean_f) ** 2
+            (energy - mean_f) ** 2 +
+            (link - mean_f) ** 2 +
+            (dist_bs - mean_f) ** 2 +
+            (radius - mean_f) ** 2 +
+            (density - mean_f) ** 2
         ) / 5.0
         confidence = 1.0 - min(1.0, math.sqrt(var_proxy))
         if self.cfg.lambda_uncertainty > 0.0 and confidence < self.cfg.uncertainty_conf_threshold:
             penalty = self.cfg.lambda_uncertainty * (1.0 - confidence)
             # Penalize riskier modes more (two-hop > chain), keep direct neutral/slightly boosted
-            scores[CASMode.CHAIN] -= 0.5 * penalty
-            scores[CASMode.TWO_HOP] -= 1.0 * penalty
-            scores[CASMode.DIRECT] += 0.1 * penalty
-
-        # Choose max score; if confidence too low, retain last mode
-        chosen = max(scores, key=scores.get)
+            scores[1] -= 0.5 * penalty
+            scores[2] -= 1.0 * penalty
+            scores[0] += 0.1 * penalty
+
+        # Choose max score (earlier mode wins ties); if confidence too low, retain last mode
+        best = 1 if scores[1] > scores[0] else 0
+        if scores[2] > scores[best]:
+            best = 2
+        chosen = _MODES[best]
         if self._last_mode is not None and confidence < self.cfg.min_confidence:
             chosen = self._last_mode
         self._last_mode = chosen
 
         # Normalize scores to [0,1] for logging
-        min_s, max_s = min(scores.values()), max(scores.values())
+        min_s, max_s = min(scores), max(scores)
         if max_s - min_s < self.cfg.eps:
-            norm_scores = {m: 0.5 for m in scores}
+            norm_scores = {m: 0.5 for m in _MODES}
         else:
-            norm_scores = {m: (v - min_s) / (max_s - min_s) for m, v in scores.items()}
+            norm_scores = {m: (v - min_s) / (max_s - min_s) for m, v in zip(_MODES, scores)}
 
         return chosen, confidence, norm_scores
 
@@ -22,11 +22,23 @@ WSN协议综合基准测试框架
 import numpy as np
 import json
 import time
-from typing import Dict, List, Tuple
-from dataclasses import dataclass, asdict
+import random
+import zlib
+import io
+import functools
+import itertools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple, Optional
+from dataclasses import dataclass, asdict, is_dataclass
 import statistics
 import os
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时退回标准库json
+    orjson = None
+
 from benchmark_protocols import LEACHProtocol, PEGASISProtocol, NetworkConfig
 from improved_energy_model import ImprovedEnergyModel, HardwarePlatform
 from integrated_enhanced_eehfr import IntegratedEnhancedEEHFRProtocol
@@ -49,6 +61,9 @@ class ExperimentConfig:
     # 输出配置
     save_detailed_results: bool = True
     results_directory: str = "../results/benchmark_experiments"
+    
+    # 并行配置 (None为CPU核数，1为串行)
+    max_workers: Optional[int] = None
 
 @dataclass
 class ExperimentResult:
@@ -63,6 +78,90 @@ class ExperimentResult:
     execution_time: float
     additional_metrics: Dict
 
+def _run_experiment(protocol_class,
+                    network_config: NetworkConfig,
+                    experiment_id: str,
+                    max_rounds: int,
+                    energy_model: ImprovedEnergyModel) -> ExperimentResult:
+    """运行单次实验"""
+
+    start_time = time.time()
+
+    # 🔧 修复随机性问题：为每次实验设置不同的随机种子
+    # 种子只由实验ID (含配置、协议与重复序号) 经CRC32得到，各次实验互不相同且可复现
+    seed = zlib.crc32(experiment_id.encode())
+    random.seed(seed)
+    np.random.seed(seed)
+
+    print(f"      [INFO] 实验 {experiment_id} 使用随机种子: {seed}")
+
+    # 创建协议实例
+    if protocol_class == IntegratedEnhancedEEHFRProtocol:
+        # Enhanced EEHFR只需要network_config
+        protocol = protocol_class(network_config)
+    else:
+        # LEACH和PEGASIS需要network_config和energy_model
+        protocol = protocol_class(network_config, energy_model)
+    
+    # 运行仿真
+    results = protocol.run_simulation(max_rounds)
+    
+    execution_time = time.time() - start_time
+    
+    # 提取额外指标
+    additional_metrics = {}
+    if hasattr(protocol, 'cluster_heads'):
+        additional_metrics['average_cluster_heads'] = results.get('average_cluster_heads_per_round', 0)
+    if hasattr(protocol, 'chain'):
+        additional_metrics['average_chain_length'] = results.get('average_chain_length', 0)
+    
+    # 创建实验结果
+    experiment_result = ExperimentResult(
+        protocol=results['protocol'],
+        config=results['config'],
+        network_lifetime=results['network_lifetime'],
+        total_energy_consumed=results['total_energy_consumed'],
+        final_alive_nodes=results['final_alive_nodes'],
+        energy_efficiency=results['energy_efficiency'],
+        packet_delivery_ratio=results['packet_delivery_ratio'],
+        execution_time=execution_time,
+        additional_metrics=additional_metrics
+    )
+    
+    return experiment_result
+
+def _json_default(o):
+    """标准库json的回退编码：数据类转字典，numpy标量/数组转Python原生类型"""
+    if is_dataclass(o) and not isinstance(o, type):
+        return asdict(o)
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+@functools.lru_cache(maxsize=None)
+def _cached_energy_model(platform_value: str) -> ImprovedEnergyModel:
+    """
+    按硬件平台缓存能耗模型，每个工作进程每个平台只构造一次
+    协议只读取模型参数，不修改其状态，可在同一进程的多次实验间共享
+    """
+    return ImprovedEnergyModel(HardwarePlatform(platform_value))
+
+def _run_task(task: Tuple):
+    """
+    进程池工作函数：在子进程中独立运行一次实验 (屏蔽协议输出)
+    异常作为返回值交回主进程，与串行路径一样只记录失败、不中断整批实验
+    """
+    protocol_class, network_config, experiment_id, max_rounds, platform_value = task
+    energy_model = _cached_energy_model(platform_value)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return _run_experiment(protocol_class, network_config, experiment_id,
+                                   max_rounds, energy_model)
+    except Exception as e:
+        return e
+
 class ComprehensiveBenchmark:
     """综合基准测试框架"""
     
@@ -79,96 +178,77 @@ class ComprehensiveBenchmark:
                             network_config: NetworkConfig,
                             experiment_id: str) -> ExperimentResult:
         """运行单次实验"""
-
-        start_time = time.time()
-
-        # 🔧 修复随机性问题：为每次实验设置不同的随机种子
-        import random
-        import hashlib
-
-        # 使用实验ID和当前时间生成唯一的随机种子
-        seed_string = f"{experiment_id}_{int(time.time() * 1000000)}"
-        seed = int(hashlib.md5(seed_string.encode()).hexdigest()[:8], 16)
-        random.seed(seed)
-
-        print(f"      [INFO] 实验 {experiment_id} 使用随机种子: {seed}")
-
-        # 创建协议实例
-        if protocol_class == IntegratedEnhancedEEHFRProtocol:
-            # Enhanced EEHFR只需要network_config
-            protocol = protocol_class(network_config)
-        else:
-            # LEACH和PEGASIS需要network_config和energy_model
-            protocol = protocol_class(network_config, self.energy_model)
-        
-        # 运行仿真
-        results = protocol.run_simulation(self.config.max_rounds)
-        
-        execution_time = time.time() - start_time
-        
-        # 提取额外指标
-        additional_metrics = {}
-        if hasattr(protocol, 'cluster_heads'):
-            additional_metrics['average_cluster_heads'] = results.get('average_cluster_heads_per_round', 0)
-        if hasattr(protocol, 'chain'):
-            additional_metrics['average_chain_length'] = results.get('average_chain_length', 0)
-        
-        # 创建实验结果
-        experiment_result = ExperimentResult(
-            protocol=results['protocol'],
-            config=results['config'],
-            network_lifetime=results['network_lifetime'],
-            total_energy_consumed=results['total_energy_consumed'],
-            final_alive_nodes=results['final_alive_nodes'],
-            energy_efficiency=results['energy_efficiency'],
-            packet_delivery_ratio=results['packet_delivery_ratio'],
-            execution_time=execution_time,
-            additional_metrics=additional_metrics
-        )
-        
-        return experiment_result
+        return _run_experiment(protocol_class, network_config, experiment_id,
+                               self.config.max_rounds, self.energy_model)
     
-    def run_protocol_comparison(self, 
-                              network_config: NetworkConfig,
-                              config_name: str) -> Dict:
-        """运行协议对比实验"""
+    # 参与对比的协议 (名称, 协议类)
+    PROTOCOLS = [
+        ('LEACH', LEACHProtocol),
+        ('PEGASIS', PEGASISProtocol),
+        ('Enhanced_EEHFR', IntegratedEnhancedEEHFRProtocol),
+    ]
+    
+    def _experiment_tasks(self, network_config: NetworkConfig, config_name: str) -> List[Tuple]:
+        """一组网络配置下所有协议、所有重复次数的实验任务 (按协议、重复序号排列)"""
+        return [
+            (protocol_class, network_config, f"{config_name}_{protocol_name}_repeat_{repeat}",
+             self.config.max_rounds, self.config.hardware_platform.value)
+            for protocol_name, protocol_class in self.PROTOCOLS
+            for repeat in range(self.config.repeat_times)
+        ]
+    
+    def _run_tasks(self, tasks: List[Tuple]) -> Iterator:
+        """
+        执行实验任务，按任务顺序逐个产出结果 (失败的实验产出其异常)
+        各次实验相互独立，max_workers不为1时分发到进程池并行运行；
+        串行时在取用结果时才运行对应实验，便于按配置输出进度
+        """
+        workers = self.config.max_workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) <= 1:
+            for protocol_class, network_config, experiment_id, _, _ in tasks:
+                try:
+                    yield self.run_single_experiment(
+                        protocol_class, network_config, experiment_id
+                    )
+                except Exception as e:
+                    yield e
+            return
         
+        chunksize = max(1, len(tasks) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(_run_task, tasks, chunksize=chunksize)
+    
+    @staticmethod
+    def _print_config_header(network_config: NetworkConfig, config_name: str):
+        """输出一组网络配置的实验标题"""
         print(f"\n[INFO] 运行实验配置: {config_name}")
         print(f"   节点数: {network_config.num_nodes}, "
               f"区域: {network_config.area_width}x{network_config.area_height}, "
               f"初始能量: {network_config.initial_energy}J")
-        
-        protocols = [
-            ('LEACH', LEACHProtocol),
-            ('PEGASIS', PEGASISProtocol),
-            ('Enhanced_EEHFR', IntegratedEnhancedEEHFRProtocol),
-        ]
+    
+    def _summarize_comparison(self, outcomes: List) -> Dict:
+        """按协议汇总一组网络配置的实验结果 (outcomes顺序与_experiment_tasks一致)"""
         
         comparison_results = {}
         
-        for protocol_name, protocol_class in protocols:
+        for index, (protocol_name, _) in enumerate(self.PROTOCOLS):
             print(f"   [TEST] 测试 {protocol_name} 协议...")
             
             protocol_results = []
             
             # 重复实验
-            for repeat in range(self.config.repeat_times):
-                experiment_id = f"{config_name}_{protocol_name}_repeat_{repeat}"
+            repeats = outcomes[index * self.config.repeat_times:(index + 1) * self.config.repeat_times]
+            for repeat, result in enumerate(repeats):
+                if isinstance(result, Exception):
+                    print(f"      [ERROR] 实验失败: {result}")
+                    continue
                 
-                try:
-                    result = self.run_single_experiment(
-                        protocol_class, network_config, experiment_id
-                    )
-                    protocol_results.append(result)
-                    
-                    if repeat == 0:  # 只显示第一次结果
-                        print(f"      生存时间: {result.network_lifetime}轮, "
-                              f"能耗: {result.total_energy_consumed:.3f}J, "
-                              f"能效: {result.energy_efficiency:.1f}")
+                protocol_results.append(result)
                 
-                except Exception as e:
-                    print(f"      [ERROR] 实验失败: {e}")
-                    continue
+                if repeat == 0:  # 只显示第一次结果
+                    print(f"      生存时间: {result.network_lifetime}轮, "
+                          f"能耗: {result.total_energy_consumed:.3f}J, "
+                          f"能效: {result.energy_efficiency:.1f}")
             
             if protocol_results:
                 # 计算统计指标
@@ -206,6 +286,16 @@ class ComprehensiveBenchmark:
         
         return comparison_results
     
+    def run_protocol_comparison(self, 
+                              network_config: NetworkConfig,
+                              config_name: str) -> Dict:
+        """运行协议对比实验"""
+        
+        self._print_config_header(network_config, config_name)
+        
+        outcomes = list(self._run_tasks(self._experiment_tasks(network_config, config_name)))
+        return self._summarize_comparison(outcomes)
+    
     def run_comprehensive_benchmark(self) -> Dict:
         """运行综合基准测试"""
         
@@ -218,6 +308,7 @@ class ComprehensiveBenchmark:
         all_results = {}
         
         # 遍历所有实验配置
+        experiment_configs = []
         for node_count in self.config.node_counts:
             for area_size in self.config.area_sizes:
                 for initial_energy in self.config.initial_energies:
@@ -231,13 +322,21 @@ class ComprehensiveBenchmark:
                     )
                     
                     config_name = f"nodes_{node_count}_area_{area_size[0]}x{area_size[1]}_energy_{initial_energy}"
-                    
-                    # 运行协议对比
-                    comparison_results = self.run_protocol_comparison(
-                        network_config, config_name
-                    )
-                    
-                    all_results[config_name] = comparison_results
+                    experiment_configs.append((config_name, network_config))
+        
+        # 所有配置的全部实验展平为一个任务列表，一次性并行执行
+        tasks_per_config = len(self.PROTOCOLS) * self.config.repeat_times
+        tasks = [task for config_name, network_config in experiment_configs
+                 for task in self._experiment_tasks(network_config, config_name)]
+        outcomes = self._run_tasks(tasks)
+        
+        # 按配置依次取回结果并汇总协议对比
+        for config_name, network_config in experiment_configs:
+            self._print_config_header(network_config, config_name)
+            
+            all_results[config_name] = self._summarize_comparison(
+                list(itertools.islice(outcomes, tasks_per_config))
+            )
         
         # 保存结果
         if self.config.save_detailed_results:
@@ -270,13 +369,22 @@ class ComprehensiveBenchmark:
         for config_name, config_results in results.items():
             serializable_results[config_name] = {}
             for protocol_name, protocol_data in config_results.items():
+                # ExperimentResult数据类直接交给编码器序列化，不再逐条asdict复制
                 serializable_results[config_name][protocol_name] = {
                     'statistics': protocol_data['statistics'],
-                    'raw_results': [asdict(r) for r in protocol_data['raw_results']]
+                    'raw_results': protocol_data['raw_results']
                 }
         
-        with open(detailed_file, 'w', encoding='utf-8') as f:
-            json.dump(serializable_results, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(detailed_file, 'wb') as f:
+                f.write(orjson.dumps(
+                    serializable_results,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                ))
+        else:
+            with open(detailed_file, 'w', encoding='utf-8') as f:
+                json.dump(serializable_results, f, indent=2, ensure_ascii=False,
+                          default=_json_default)
         
         print(f"\n[SAVE] 详细结果已保存: {detailed_file}")
         
@@ -30,9 +30,13 @@ import random
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
-import copy
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
 
-@dataclass
+# 节点在仿真中被频繁访问，Python 3.10+ 上用slots省去实例字典
+_NODE_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_NODE_DATACLASS_OPTIONS)
 class Node:
     """WSN节点类"""
     id: int
@@ -60,6 +64,7 @@ class NetworkConfig:
     data_packet_size: int = 4000     # 4000 bits
     hello_packet_size: int = 100     # 100 bits (协议开销)
     num_packet_attempts: int = 10    # 每轮传输尝试次数
+    rng_seed: Optional[int] = None   # 协议随机数种子 (None时由全局random派生)
 
 class CorrectedLEACHProtocol:
     """修正版LEACH协议 - 严格匹配权威行为"""
@@ -94,49 +99,98 @@ class CorrectedLEACHProtocol:
             'round_stats': []
         }
         
+        # 协议私有随机数生成器 (节点部署、簇头选择、数据传输)
+        # 未指定rng_seed时由全局random派生，random.seed后结果仍可复现
+        seed = config.rng_seed if config.rng_seed is not None else random.getrandbits(64)
+        self._rng = np.random.default_rng(seed)
+        self._round_rand = np.empty(0)
+        self._rand_cursor = 0
+
         # 初始化网络
         self._initialize_network()
+
+    def _draw_round_randoms(self):
+        """
+        每轮开始时一次生成本轮所需的全部均匀随机数
+        簇头选举每节点1个，数据传输每次尝试至多2个 (选簇头、选成员)
+        """
+        self._round_rand = self._rng.random(len(self.nodes) + 2 * self.config.num_packet_attempts)
+        self._rand_cursor = 0
+
+    def _urand(self) -> float:
+        """按顺序取出本轮预生成的下一个[0, 1)均匀随机数"""
+        u = self._round_rand[self._rand_cursor]
+        self._rand_cursor += 1
+        return u
+
+    def _choice(self, items: list):
+        """用预生成随机数从非空列表中等概率选取一项"""
+        return items[int(self._urand() * len(items))]
     
     def _initialize_network(self):
-        """初始化网络节点"""
-        self.nodes = []
-        for i in range(self.config.num_nodes):
-            x = random.uniform(0, self.config.area_width)
-            y = random.uniform(0, self.config.area_height)
-            
-            node = Node(
+        """初始化网络节点 (坐标一次向量化生成)"""
+        # 节点位置固定不变，坐标按SoA存为数组，两两距离一次性算好
+        self._xy = self._rng.uniform([0.0, 0.0], [self.config.area_width, self.config.area_height],
+                                     size=(self.config.num_nodes, 2))
+        self.nodes = [
+            Node(
                 id=i,
                 x=x,
                 y=y,
                 initial_energy=self.config.initial_energy,
                 current_energy=self.config.initial_energy
             )
-            self.nodes.append(node)
+            for i, (x, y) in enumerate(self._xy.tolist())
+        ]
+        self._D = cdist(self._xy, self._xy)
+        self._d_to_bs = np.hypot(self._xy[:, 0] - self.config.base_station_x,
+                                 self._xy[:, 1] - self.config.base_station_y)
+        # 数据包直达基站的发送能耗只取决于节点位置，按节点id建查找表
+        self._bs_tx_data = self._transmission_energy_vec(self.config.data_packet_size, self._d_to_bs)
+
+        # 簇头Hello广播的通信范围内邻居：位置静止，用KD树半径查询一次性建好
+        # 假设通信范围为50m (可调整)
+        self.hello_range = 50.0
+        self._hello_neighbors = []
+        if self.nodes:
+            tree = cKDTree(self._xy)
+            self._hello_neighbors = list(
+                tree.query_ball_point(self._xy, self.hello_range, return_sorted=True)
+            )
     
     def _calculate_distance(self, node1: Node, node2: Node) -> float:
-        """计算两节点间距离"""
-        return math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+        """计算两节点间距离（查预计算距离矩阵）"""
+        return float(self._D[node1.id, node2.id])
     
     def _calculate_distance_to_bs(self, node: Node) -> float:
-        """计算节点到基站距离"""
-        return math.sqrt((node.x - self.config.base_station_x)**2 + 
-                        (node.y - self.config.base_station_y)**2)
+        """计算节点到基站距离（查预计算表）"""
+        return float(self._d_to_bs[node.id])
     
     def _calculate_transmission_energy(self, packet_size_bits: int, distance: float) -> float:
         """
         严格匹配权威LEACH的能耗计算
         基于权威LEACH-PY源码实现
         """
-        # 权威LEACH能耗公式
+        # 权威LEACH能耗公式 (d^4由d^2自乘得到，避免走pow)
+        d2 = distance * distance
         if distance > self.d_crossover:
             # 多径衰落模型 (distance > do)
-            tx_energy = self.ETX * packet_size_bits + self.Emp * packet_size_bits * (distance ** 4)
+            tx_energy = self.ETX * packet_size_bits + self.Emp * packet_size_bits * (d2 * d2)
         else:
             # 自由空间模型 (distance <= do)
-            tx_energy = self.ETX * packet_size_bits + self.Efs * packet_size_bits * (distance ** 2)
+            tx_energy = self.ETX * packet_size_bits + self.Efs * packet_size_bits * d2
 
         return tx_energy
 
+    def _transmission_energy_vec(self, packet_size_bits: int, distances: np.ndarray) -> np.ndarray:
+        """_calculate_transmission_energy的向量化版本，逐元素结果与标量公式一致"""
+        distances = np.asarray(distances, dtype=np.float64)
+        d2 = distances * distances
+        amp = np.where(distances > self.d_crossover,
+                       self.Emp * packet_size_bits * (d2 * d2),
+                       self.Efs * packet_size_bits * d2)
+        return self.ETX * packet_size_bits + amp
+
     def _calculate_reception_energy(self, packet_size_bits: int) -> float:
         """
         严格匹配权威LEACH的接收能耗计算
@@ -161,15 +215,16 @@ class CorrectedLEACHProtocol:
         if not alive_nodes:
             return 0.0
 
+        # Hello包大小固定，接收能耗每轮只算一次
+        hello_bits = self.config.hello_packet_size
+        rx_energy = self._calculate_reception_energy(hello_bits)
+
         # 阶段1: 基站向所有节点广播Hello消息 (权威LEACH第227-247行)
         # 基站发送Hello给所有活跃节点
         bs_to_nodes_energy = 0.0
         for node in alive_nodes:
-            distance_to_bs = self._calculate_distance_to_bs(node)
-
             # 基站发送能耗 (基站能量无限，不计算)
             # 节点接收能耗
-            rx_energy = self._calculate_reception_energy(self.config.hello_packet_size)
             node.current_energy -= rx_energy
             bs_to_nodes_energy += rx_energy
             hello_messages_sent += 1
@@ -188,28 +243,25 @@ class CorrectedLEACHProtocol:
             if not ch.is_alive:
                 continue
 
-            # 找到在簇头通信范围内的节点
-            receivers_in_range = []
-            for node in self.nodes:
-                if node.is_alive and node.id != ch.id:
-                    distance = self._calculate_distance(ch, node)
-                    # 假设通信范围为50m (可调整)
-                    if distance <= 50.0:
-                        receivers_in_range.append(node)
+            # 找到在簇头通信范围内的节点 (预建的KD树邻居表)
+            ch_row = self._D[ch.id]
+            receivers_in_range = [
+                self.nodes[i] for i in self._hello_neighbors[ch.id]
+                if i != ch.id and self.nodes[i].is_alive
+            ]
 
-            # 簇头向范围内每个节点发送Hello消息
-            for receiver in receivers_in_range:
-                distance = self._calculate_distance(ch, receiver)
+            # 簇头到各接收节点的发送能耗一次批量算出
+            tx_energies = self._transmission_energy_vec(
+                hello_bits, ch_row[[r.id for r in receivers_in_range]]
+            ).tolist()
 
+            # 簇头向范围内每个节点发送Hello消息
+            for receiver, tx_energy in zip(receivers_in_range, tx_energies):
                 # 簇头发送能耗
-                tx_energy = self._calculate_transmission_energy(
-                    self.config.hello_packet_size, distance
-                )
                 ch.current_energy -= tx_energy
                 ch_broadcast_energy += tx_energy
 
                 # 接收节点接收能耗
-                rx_energy = self._calculate_reception_energy(self.config.hello_packet_size)
                 receiver.current_energy -= rx_energy
                 ch_broadcast_energy += rx_energy
 
@@ -240,33 +292,37 @@ class CorrectedLEACHProtocol:
         """
         cluster_heads = []
         
-        for node in self.nodes:
-            if not node.is_alive:
-                continue
-            
-            # 权威LEACH阈值计算
-            # T(n) = P / (1 - P * (r mod (1/P))) if n ∈ G
-            # 其中G是在过去1/P轮中没有当过簇头的节点集合
-            
-            if self.round_number % int(1/self.p) == 0:
-                # 新周期开始，重置所有节点的簇头历史
-                node.round_as_ch = -1
-            
-            # 检查节点是否在当前周期内当过簇头
-            current_cycle_start = (self.round_number // int(1/self.p)) * int(1/self.p)
-            if node.round_as_ch >= current_cycle_start:
-                continue  # 本周期已当过簇头，跳过
-            
-            # 计算阈值
-            threshold = self.p / (1 - self.p * (self.round_number % int(1/self.p)))
-            
-            # 随机选择
-            if random.random() < threshold:
-                node.is_cluster_head = True
-                node.round_as_ch = self.round_number
-                cluster_heads.append(node)
-            else:
-                node.is_cluster_head = False
+        nodes = self.nodes
+        n = len(nodes)
+        period = int(1/self.p)
+        r = self.round_number
+
+        # 权威LEACH阈值计算
+        # T(n) = P / (1 - P * (r mod (1/P))) if n ∈ G
+        # 其中G是在过去1/P轮中没有当过簇头的节点集合
+        threshold = self.p / (1 - self.p * (r % period))
+        current_cycle_start = (r // period) * period
+
+        alive = np.fromiter((node.is_alive for node in nodes), dtype=bool, count=n)
+        if r % period == 0:
+            # 新周期开始，重置所有节点的簇头历史
+            for i in np.flatnonzero(alive).tolist():
+                nodes[i].round_as_ch = -1
+        round_as_ch = np.fromiter((node.round_as_ch for node in nodes), dtype=np.int64, count=n)
+
+        # 本周期未当过簇头的存活节点参与选举，随机数整轮一次生成
+        eligible = alive & (round_as_ch < current_cycle_start)
+        draws = self._round_rand[self._rand_cursor:self._rand_cursor + n]
+        self._rand_cursor += n
+        selected = eligible & (draws < threshold)
+
+        for i in np.flatnonzero(eligible & ~selected).tolist():
+            nodes[i].is_cluster_head = False
+        for i in np.flatnonzero(selected).tolist():
+            node = nodes[i]
+            node.is_cluster_head = True
+            node.round_as_ch = r
+            cluster_heads.append(node)
         
         return cluster_heads
     
@@ -280,30 +336,27 @@ class CorrectedLEACHProtocol:
             ch.my_cluster_head = ch.id  # 簇头的MCH是自己
         
         # 非簇头节点加入最近的簇头
-        for node in self.nodes:
-            if not node.is_alive or node.is_cluster_head:
-                continue
-            
-            if not cluster_heads:
-                # 没有簇头，直接连接基站
+        members = [node for node in self.nodes
+                   if node.is_alive and not node.is_cluster_head]
+        if not members:
+            return
+
+        if not cluster_heads:
+            # 没有簇头，直接连接基站
+            for node in members:
                 node.cluster_id = -1
                 node.my_cluster_head = -1  # -1表示基站
-                continue
-            
-            # 找到最近的簇头
-            best_ch = None
-            min_distance = float('inf')
-            
-            for ch in cluster_heads:
-                distance = self._calculate_distance(node, ch)
-                if distance < min_distance:
-                    min_distance = distance
-                    best_ch = ch
-            
-            if best_ch:
-                node.cluster_id = best_ch.id
-                node.my_cluster_head = best_ch.id
-                self.clusters[best_ch.id].append(node)
+            return
+
+        # 找到最近的簇头：成员×簇头距离子矩阵上一次argmin
+        ch_ids = np.array([ch.id for ch in cluster_heads], dtype=np.intp)
+        member_ids = np.array([node.id for node in members], dtype=np.intp)
+        nearest = ch_ids[self._D[np.ix_(member_ids, ch_ids)].argmin(axis=1)]
+
+        for node, ch_id in zip(members, nearest.tolist()):
+            node.cluster_id = ch_id
+            node.my_cluster_head = ch_id
+            self.clusters[ch_id].append(node)
     
     def _data_transmission_phase(self) -> Tuple[int, int, int, float]:
         """
@@ -326,23 +379,29 @@ class CorrectedLEACHProtocol:
         # 权威LEACH的关键逻辑：基于簇头进行数据传输
         # 参考权威LEACH第416-450行的steady_state_phase
 
+        # 循环不变量提到循环外：数据包大小、簇头接收能耗
+        data_bits = self.config.data_packet_size
+        rx_energy = self._calculate_reception_energy(data_bits)
+
+        # 存活簇头/存活节点列表只在有节点死亡时变化，循环中就地摘除而不是每次尝试重建
+        alive_cluster_heads = [ch for ch in self.cluster_heads if ch.is_alive]
+        alive_nodes = None  # 仅在无簇头时才需要，首次用到时构建
+
         for _ in range(self.config.num_packet_attempts):
             transmission_attempts += 1
 
             # 如果没有活跃的簇头，随机选择节点直接向基站传输
-            alive_cluster_heads = [ch for ch in self.cluster_heads if ch.is_alive]
-
             if not alive_cluster_heads:
                 # 没有簇头，随机选择节点直接向基站传输
-                alive_nodes = [n for n in self.nodes if n.is_alive]
+                if alive_nodes is None:
+                    alive_nodes = [n for n in self.nodes if n.is_alive]
                 if not alive_nodes:
                     break
 
-                sender = random.choice(alive_nodes)
-                distance = self._calculate_distance_to_bs(sender)
+                sender = self._choice(alive_nodes)
 
-                # 计算传输能耗
-                tx_energy = self._calculate_transmission_energy(self.config.data_packet_size, distance)
+                # 传输能耗 (查表)
+                tx_energy = float(self._bs_tx_data[sender.id])
 
                 if sender.current_energy >= tx_energy:
                     sender.current_energy -= tx_energy
@@ -353,11 +412,12 @@ class CorrectedLEACHProtocol:
                     if sender.current_energy <= 0:
                         sender.is_alive = False
                         sender.current_energy = 0
+                        alive_nodes.remove(sender)
 
                 continue
 
             # 权威LEACH模式：为每个簇头找到发送者
-            selected_ch = random.choice(alive_cluster_heads)
+            selected_ch = self._choice(alive_cluster_heads)
 
             # 找到该簇头的成员节点作为发送者
             cluster_members = []
@@ -366,18 +426,17 @@ class CorrectedLEACHProtocol:
 
             if cluster_members:
                 # 簇内有成员，成员向簇头发送数据
-                sender = random.choice(cluster_members)
+                sender = self._choice(cluster_members)
                 distance = self._calculate_distance(sender, selected_ch)
 
                 # 成员节点发送能耗
-                tx_energy = self._calculate_transmission_energy(self.config.data_packet_size, distance)
+                tx_energy = self._calculate_transmission_energy(data_bits, distance)
 
                 if sender.current_energy >= tx_energy:
                     sender.current_energy -= tx_energy
                     energy_consumed += tx_energy
 
                     # 簇头接收能耗
-                    rx_energy = self._calculate_reception_energy(self.config.data_packet_size)
                     if selected_ch.current_energy >= rx_energy:
                         selected_ch.current_energy -= rx_energy
                         energy_consumed += rx_energy
@@ -385,8 +444,7 @@ class CorrectedLEACHProtocol:
                         packets_received += 1
 
                         # 簇头向基站转发聚合数据
-                        bs_distance = self._calculate_distance_to_bs(selected_ch)
-                        bs_tx_energy = self._calculate_transmission_energy(self.config.data_packet_size, bs_distance)
+                        bs_tx_energy = float(self._bs_tx_data[selected_ch.id])
 
                         if selected_ch.current_energy >= bs_tx_energy:
                             selected_ch.current_energy -= bs_tx_energy
@@ -394,17 +452,18 @@ class CorrectedLEACHProtocol:
                         else:
                             selected_ch.is_alive = False
                             selected_ch.current_energy = 0
+                            alive_cluster_heads.remove(selected_ch)
                     else:
                         selected_ch.is_alive = False
                         selected_ch.current_energy = 0
+                        alive_cluster_heads.remove(selected_ch)
 
                     if sender.current_energy <= 0:
                         sender.is_alive = False
                         sender.current_energy = 0
             else:
                 # 簇头没有成员，簇头直接向基站发送数据
-                distance = self._calculate_distance_to_bs(selected_ch)
-                tx_energy = self._calculate_transmission_energy(self.config.data_packet_size, distance)
+                tx_energy = float(self._bs_tx_data[selected_ch.id])
 
                 if selected_ch.current_energy >= tx_energy:
                     selected_ch.current_energy -= tx_energy
@@ -415,6 +474,7 @@ class CorrectedLEACHProtocol:
                     if selected_ch.current_energy <= 0:
                         selected_ch.is_alive = False
                         selected_ch.current_energy = 0
+                        alive_cluster_heads.remove(selected_ch)
 
         return packets_sent, packets_received, transmission_attempts, energy_consumed
 
@@ -422,10 +482,13 @@ class CorrectedLEACHProtocol:
         """运行一轮LEACH协议 - 严格匹配权威行为"""
         self.round_number += 1
 
+        # 本轮开始时的存活节点只遍历一次，轮次统计与存活检查共用
+        alive_nodes = [n for n in self.nodes if n.is_alive]
+
         # 初始化轮次统计
         round_stats = {
             'round': self.round_number,
-            'alive_nodes_start': sum(1 for n in self.nodes if n.is_alive),
+            'alive_nodes_start': len(alive_nodes),
             'cluster_heads': 0,
             'packets_sent': 0,
             'packets_received': 0,
@@ -437,11 +500,11 @@ class CorrectedLEACHProtocol:
         }
 
         # 检查网络是否还活着
-        alive_nodes = [n for n in self.nodes if n.is_alive]
         if len(alive_nodes) == 0:
             return round_stats
 
         energy_before = sum(n.current_energy for n in self.nodes)
+        self._draw_round_randoms()
 
         # 1. 协议开销阶段：Hello消息广播
         hello_energy = self._broadcast_hello_messages()
@@ -17,7 +17,8 @@ Enhanced PEGASIS: 能量感知的链式路由协议
 
 import math
 import random
-from typing import List, Dict, Tuple
+import numpy as np
+from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from benchmark_protocols import NetworkConfig
 from improved_energy_model import ImprovedEnergyModel, HardwarePlatform
@@ -75,11 +76,11 @@ class EnhancedNode:
     
     def distance_to(self, other: 'EnhancedNode') -> float:
         """计算到另一个节点的距离"""
-        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
+        return math.hypot(self.x - other.x, self.y - other.y)
     
     def distance_to_base_station(self, bs_x: float, bs_y: float) -> float:
         """计算到基站的距离"""
-        return math.sqrt((self.x - bs_x)**2 + (self.y - bs_y)**2)
+        return math.hypot(self.x - bs_x, self.y - bs_y)
 
 class EnhancedPEGASISProtocol:
     """Enhanced PEGASIS协议主类"""
@@ -88,6 +89,9 @@ class EnhancedPEGASISProtocol:
         self.config = config
         self.nodes: List[EnhancedNode] = []
         self.chain: List[int] = []  # 节点ID的链序列
+        # 节点间距离矩阵 (按节点id索引)，节点静止，首次使用时构建一次
+        self._D = None
+        self._d_to_bs = None
         self.current_leader_id = -1
         self.current_round = 0
         self.base_station = (config.base_station_x, config.base_station_y)
@@ -111,43 +115,70 @@ class EnhancedPEGASISProtocol:
             y = random.uniform(0, self.config.area_height)
             node = EnhancedNode(i, x, y, self.config.initial_energy)
             self.nodes.append(node)
+        self._D = None
+        self._d_to_bs = None
         
         # 构建初始链
         self.build_energy_aware_chain()
         print(f"✅ Enhanced PEGASIS网络初始化完成: {len(self.nodes)}个节点")
     
-    def build_energy_aware_chain(self):
-        """构建能量感知的链结构"""
-        alive_nodes = [node for node in self.nodes if node.is_alive()]
+    def _distance_matrix(self) -> np.ndarray:
+        """节点间距离矩阵，按需构建并跨轮次复用"""
+        if self._D is None:
+            x = np.array([node.x for node in self.nodes], dtype=float)
+            y = np.array([node.y for node in self.nodes], dtype=float)
+            self._D = np.hypot(x[:, None] - x, y[:, None] - y)
+        return self._D
+
+    def _distances_to_bs(self) -> np.ndarray:
+        """各节点到基站的距离 (按节点id索引)，按需构建并跨轮次复用"""
+        if self._d_to_bs is None:
+            bs_x, bs_y = self.base_station
+            x = np.array([node.x for node in self.nodes], dtype=float)
+            y = np.array([node.y for node in self.nodes], dtype=float)
+            self._d_to_bs = np.hypot(x - bs_x, y - bs_y)
+        return self._d_to_bs
+
+    def _distance(self, a: EnhancedNode, b: EnhancedNode) -> float:
+        """两节点间距离 (查距离矩阵)"""
+        return float(self._distance_matrix()[a.id, b.id])
+
+    def build_energy_aware_chain(self, alive_nodes: Optional[List[EnhancedNode]] = None):
+        """构建能量感知的链结构 (alive_nodes可由调用方传入本轮已求得的存活节点)"""
+        if alive_nodes is None:
+            alive_nodes = [node for node in self.nodes if node.is_alive()]
         if len(alive_nodes) <= 1:
             self.chain = [alive_nodes[0].id] if alive_nodes else []
             return
         
         # 改进1: 能量感知的起始节点选择
         # 不再选择距离基站最远的节点，而是选择能量充足且位置合适的节点
-        start_candidates = sorted(alive_nodes, 
-                                key=lambda n: (n.energy_ratio(), 
-                                             -n.distance_to_base_station(*self.base_station)), 
-                                reverse=True)
+        # 按能量比例降序、同能量时按到基站距离升序排序 (lexsort稳定，与原sorted次序一致)
+        alive_ids = np.array([node.id for node in alive_nodes])
+        bs_distances = self._distances_to_bs()[alive_ids]
+        energy_ratios = np.array([node.energy_ratio() for node in alive_nodes])
+        start_candidates = np.lexsort((bs_distances, -energy_ratios))
         
         # 选择前30%能量充足的节点中距离基站较远的作为起点
-        top_energy_nodes = start_candidates[:max(1, len(start_candidates) // 3)]
-        start_node = max(top_energy_nodes, 
-                        key=lambda n: n.distance_to_base_station(*self.base_station))
+        top_energy_nodes = start_candidates[:max(1, len(alive_nodes) // 3)]
+        start_node = alive_nodes[int(top_energy_nodes[bs_distances[top_energy_nodes].argmax()])]
         
         # 改进2: 能量感知的贪心链构建
         chain = [start_node.id]
         remaining = [n for n in alive_nodes if n.id != start_node.id]
         current = start_node
+        D = self._distance_matrix()
         
         while remaining:
             # 计算每个候选节点的综合得分
             best_node = None
             best_score = float('-inf')
+            # 当前链端到各节点的距离一次取出
+            dist_row = D[current.id].tolist()
             
             for candidate in remaining:
                 # 距离因子 (越近越好)
-                distance = current.distance_to(candidate)
+                distance = dist_row[candidate.id]
                 distance_score = 1.0 / (1.0 + distance)
                 
                 # 能量因子 (能量越多越好)
@@ -174,23 +205,26 @@ class EnhancedPEGASISProtocol:
             node.next_node_id = chain[i + 1] if i < len(chain) - 1 else -1
             node.prev_node_id = chain[i - 1] if i > 0 else -1
     
-    def select_leader(self) -> int:
+    def select_leader(self, alive_nodes: Optional[List[EnhancedNode]] = None) -> int:
         """改进3: 智能领导者选择"""
-        alive_nodes = [node for node in self.nodes if node.is_alive()]
+        if alive_nodes is None:
+            alive_nodes = [node for node in self.nodes if node.is_alive()]
         if not alive_nodes:
             return -1
         
         # 计算每个节点的领导者适合度
         best_leader = None
         best_fitness = float('-inf')
+
+        # 各存活节点到基站的距离及其均值只算一次
+        bs_distances = [n.distance_to_base_station(*self.base_station) for n in alive_nodes]
+        avg_distance = sum(bs_distances) / len(alive_nodes)
         
-        for node in alive_nodes:
+        for node, distance_to_bs in zip(alive_nodes, bs_distances):
             # 能量因子 (40%)
             energy_factor = node.energy_ratio()
             
             # 位置因子 (30%) - 距离基站适中的节点更适合
-            distance_to_bs = node.distance_to_base_station(*self.base_station)
-            avg_distance = sum(n.distance_to_base_station(*self.base_station) for n in alive_nodes) / len(alive_nodes)
             position_factor = 1.0 / (1.0 + abs(distance_to_bs - avg_distance))
             
             # 负载均衡因子 (20%) - 之前当过领导者的节点优先级降低
@@ -219,7 +253,7 @@ class EnhancedPEGASISProtocol:
         
         return -1
     
-    def data_transmission_round(self) -> int:
+    def data_transmission_round(self, alive_nodes: Optional[List[EnhancedNode]] = None) -> int:
         """数据传输轮次 - 修复版本，确保正确的数据包计数"""
         if not self.chain or self.current_leader_id == -1:
             return 0
@@ -227,7 +261,8 @@ class EnhancedPEGASISProtocol:
         total_packets = 0
         leader_node = self.nodes[self.current_leader_id]
         leader_position = leader_node.chain_position
-        alive_nodes = [node for node in self.nodes if node.is_alive()]
+        if alive_nodes is None:
+            alive_nodes = [node for node in self.nodes if node.is_alive()]
 
         if not alive_nodes:
             return 0
@@ -251,7 +286,7 @@ class EnhancedPEGASISProtocol:
                 continue
 
             # 计算传输距离和能耗
-            distance = current_node.distance_to(next_node)
+            distance = self._distance(current_node, next_node)
             tx_energy = self.energy_model.calculate_transmission_energy(
                 self.config.packet_size * 8, distance
             )
@@ -295,7 +330,7 @@ class EnhancedPEGASISProtocol:
                 continue
 
             # 计算传输距离和能耗
-            distance = current_node.distance_to(prev_node)
+            distance = self._distance(current_node, prev_node)
             tx_energy = self.energy_model.calculate_transmission_energy(
                 self.config.packet_size * 8, distance
             )
@@ -353,23 +388,23 @@ class EnhancedPEGASISProtocol:
         """运行一轮协议"""
         self.current_round += 1
 
-        # 检查存活节点
+        # 检查存活节点 (建链、选领导者期间能量不变，本轮存活列表只求一次)
         alive_nodes = [node for node in self.nodes if node.is_alive()]
         if not alive_nodes:
             return False
 
         # 定期优化链结构
         if self.current_round % self.config.chain_optimization_interval == 1:
-            self.build_energy_aware_chain()
+            self.build_energy_aware_chain(alive_nodes)
 
         # 定期轮换领导者
         if (self.current_round % self.config.leader_rotation_interval == 1 or
             self.current_leader_id == -1 or
             not self.nodes[self.current_leader_id].is_alive()):
-            self.select_leader()
+            self.select_leader(alive_nodes)
 
         # 执行数据传输
-        packets_sent = self.data_transmission_round()
+        packets_sent = self.data_transmission_round(alive_nodes)
 
         # 记录统计信息
         alive_count = len(alive_nodes)
@@ -32,7 +32,10 @@ import random
 from typing import List, Dict, Tuple
 from dataclasses import dataclass
 
-@dataclass
+# 节点在仿真中被频繁访问，Python 3.10+ 上用slots省去实例字典
+_NODE_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_NODE_DATACLASS_OPTIONS)
 class Node:
     """WSN节点类 - 匹配权威LEACH属性"""
     id: int
@@ -110,22 +113,34 @@ class FinalCorrectedLEACH:
                 current_energy=self.config.initial_energy
             )
             self.nodes.append(node)
+
+        # 节点与基站都静止，节点到基站距离只算一次 (按节点id索引)
+        self._xy = np.array([(node.x, node.y) for node in self.nodes], dtype=np.float64).reshape(-1, 2)
+        self._d_to_bs = np.hypot(self._xy[:, 0] - self.config.base_station_x,
+                                 self._xy[:, 1] - self.config.base_station_y)
     
     def _calculate_distance(self, node1: Node, node2: Node) -> float:
         """计算节点间距离"""
-        return math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+        return math.hypot(node1.x - node2.x, node1.y - node2.y)
+
+    @staticmethod
+    def _squared_distance(node1: Node, node2: Node) -> float:
+        """节点间距离的平方，仅用于比较远近 (省去开方)"""
+        dx = node1.x - node2.x
+        dy = node1.y - node2.y
+        return dx * dx + dy * dy
     
     def _calculate_distance_to_bs(self, node: Node) -> float:
-        """计算到基站距离"""
-        return math.sqrt((node.x - self.config.base_station_x)**2 + 
-                        (node.y - self.config.base_station_y)**2)
+        """计算到基站距离（查预计算表）"""
+        return float(self._d_to_bs[node.id])
     
     def _calculate_transmission_energy(self, packet_size_bits: int, distance: float) -> float:
-        """权威LEACH能耗计算"""
+        """权威LEACH能耗计算 (d^4由d^2自乘得到，避免走pow)"""
+        d2 = distance * distance
         if distance > self.do:
-            return self.ETX * packet_size_bits + self.Emp * packet_size_bits * (distance ** 4)
+            return self.ETX * packet_size_bits + self.Emp * packet_size_bits * (d2 * d2)
         else:
-            return self.ETX * packet_size_bits + self.Efs * packet_size_bits * (distance ** 2)
+            return self.ETX * packet_size_bits + self.Efs * packet_size_bits * d2
     
     def _calculate_reception_energy(self, packet_size_bits: int) -> float:
         """权威LEACH接收能耗"""
@@ -159,15 +174,16 @@ class FinalCorrectedLEACH:
                 node.current_energy = 0
         
         # 阶段2: 簇头向范围内节点广播Hello (权威LEACH第376-408行)
+        hello_range_sq = 50.0 * 50.0
         for ch in self.cluster_heads:
             if not ch.is_alive:
                 continue
             
-            # 找到通信范围内的节点
+            # 找到通信范围内的节点 (先用平方距离筛选，仅范围内节点开方求能耗)
             for node in self.nodes:
                 if node.is_alive and node.id != ch.id:
-                    distance = self._calculate_distance(ch, node)
-                    if distance <= 50.0:  # 通信范围
+                    if self._squared_distance(ch, node) <= hello_range_sq:  # 通信范围
+                        distance = self._calculate_distance(ch, node)
                         # 簇头发送Hello的巨大能耗
                         tx_energy = self._calculate_transmission_energy(
                             self.config.hello_packet_size, distance
@@ -233,27 +249,26 @@ class FinalCorrectedLEACH:
             ch.MCH = ch.id
         
         # 节点加入最近簇头
-        for node in self.nodes:
-            if not node.is_alive or node.is_cluster_head:
-                continue
-            
-            if not cluster_heads:
+        members = [node for node in self.nodes
+                   if node.is_alive and not node.is_cluster_head]
+        if not members:
+            return
+
+        if not cluster_heads:
+            for node in members:
                 node.MCH = -1  # 直连基站
-                continue
-            
-            # 找最近簇头
-            best_ch = None
-            min_distance = float('inf')
-            
-            for ch in cluster_heads:
-                distance = self._calculate_distance(node, ch)
-                if distance < min_distance:
-                    min_distance = distance
-                    best_ch = ch
-            
-            if best_ch:
-                node.MCH = best_ch.id
-                self.clusters[best_ch.id].append(node)
+            return
+
+        # 找最近簇头：成员×簇头平方距离矩阵上一次argmin (距离只用于比较，无需开方)
+        ch_ids = np.array([ch.id for ch in cluster_heads], dtype=np.intp)
+        member_ids = np.array([node.id for node in members], dtype=np.intp)
+        diff = self._xy[member_ids, None, :] - self._xy[ch_ids]
+        d2 = np.einsum('ijk,ijk->ij', diff, diff)
+        nearest = ch_ids[d2.argmin(axis=1)]
+
+        for node, ch_id in zip(members, nearest.tolist()):
+            node.MCH = ch_id
+            self.clusters[ch_id].append(node)
     
     def _steady_state_data_transmission(self) -> Tuple[int, int, float]:
         """
@@ -72,6 +72,9 @@ class HEEDProtocol:
     def __init__(self, config: HEEDConfig):
         self.config = config
         self.nodes: List[HEEDNode] = []
+        # Node coordinates as separate contiguous arrays (SoA), indexed by node id
+        self.node_x = np.empty(0)
+        self.node_y = np.empty(0)
         self.clusters: Dict[int, List[int]] = {}
         self.round_number = 0
         self.total_energy_consumed = 0.0
@@ -102,6 +105,8 @@ class HEEDProtocol:
                 transmission_range=self.config.transmission_range
             )
             self.nodes.append(node)
+        self.node_x = np.array([node.x for node in self.nodes], dtype=float)
+        self.node_y = np.array([node.y for node in self.nodes], dtype=float)
         
         # Build neighbor lists
         self._build_neighbor_lists()
@@ -109,17 +114,17 @@ class HEEDProtocol:
     
     def _build_neighbor_lists(self):
         """Build neighbor lists for all nodes"""
-        for i, node in enumerate(self.nodes):
-            node.neighbors = []
-            for j, other_node in enumerate(self.nodes):
-                if i != j:
-                    distance = self._calculate_distance(node, other_node)
-                    if distance <= self.config.transmission_range:
-                        node.neighbors.append(j)
+        # Pairwise squared distances by broadcasting the coordinate arrays
+        dx = self.node_x[:, None] - self.node_x
+        dy = self.node_y[:, None] - self.node_y
+        in_range = dx * dx + dy * dy <= self.config.transmission_range ** 2
+        np.fill_diagonal(in_range, False)
+        for node, row in zip(self.nodes, in_range):
+            node.neighbors = np.flatnonzero(row).tolist()
     
     def _calculate_distance(self, node1: HEEDNode, node2: HEEDNode) -> float:
         """Calculate Euclidean distance between two nodes"""
-        return math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+        return math.hypot(node1.x - node2.x, node1.y - node2.y)
     
     def _calculate_communication_cost(self, node: HEEDNode) -> float:
         """Calculate intra-cluster communication cost for a node"""
@@ -324,9 +329,9 @@ class HEEDProtocol:
             return
         
         # Distance to base station
-        distance = math.sqrt(
-            (ch_node.x - self.config.base_station_x)**2 + 
-            (ch_node.y - self.config.base_station_y)**2
+        distance = math.hypot(
+            ch_node.x - self.config.base_station_x,
+            ch_node.y - self.config.base_station_y
         )
         
         # Energy consumption for long-range transmission
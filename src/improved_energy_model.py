@@ -158,6 +158,43 @@ class ImprovedEnergyModel:
         
         return total_energy
     
+    def calculate_transmission_energy_batch(self,
+                                          data_size_bits: int,
+                                          distances: np.ndarray,
+                                          tx_power_dbm: float = 0.0,
+                                          temperature_c: float = 25.0,
+                                          humidity_ratio: float = 0.5) -> np.ndarray:
+        """
+        批量计算传输能耗 (逐元素与calculate_transmission_energy一致)
+        
+        Args:
+            data_size_bits: 数据大小 (bits)
+            distances: 传输距离数组 (m)
+            tx_power_dbm: 发射功率 (dBm)
+            temperature_c: 环境温度 (°C)
+            humidity_ratio: 相对湿度 (0-1)
+            
+        Returns:
+            各距离对应的传输能耗数组 (J)
+        """
+        
+        distances = np.asarray(distances, dtype=np.float64)
+        base_tx_energy = data_size_bits * self.params.tx_energy_per_bit
+        tx_power_linear = 10**(tx_power_dbm / 10) / 1000
+        amp_coefficient = tx_power_linear / self.params.amplifier_efficiency
+        
+        # 自由空间 d^2 / 多径 d^4，阈值与标量版本相同
+        amplifier_energy = np.where(
+            distances <= self.params.path_loss_threshold,
+            amp_coefficient * distances**2 * 1e-9 * data_size_bits,
+            amp_coefficient * distances**4 * 1e-12 * data_size_bits
+        )
+        
+        temp_factor = 1 + self.temperature_coefficient * abs(temperature_c - 25.0)
+        humidity_factor = 1 + self.humidity_coefficient * humidity_ratio
+        
+        return (base_tx_energy + amplifier_energy) * temp_factor * humidity_factor
+    
     def calculate_reception_energy(self, 
                                  data_size_bits: int,
                                  temperature_c: float = 25.0,
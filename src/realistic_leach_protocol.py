@@ -29,7 +29,6 @@ import random
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
-import copy
 
 @dataclass
 class Node:
@@ -248,12 +247,12 @@ class RealisticLEACHProtocol:
     
     def _calculate_distance(self, node1: Node, node2: Node) -> float:
         """计算两节点间距离"""
-        return math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+        return math.hypot(node1.x - node2.x, node1.y - node2.y)
     
     def _calculate_distance_to_bs(self, node: Node) -> float:
         """计算节点到基站距离"""
-        return math.sqrt((node.x - self.config.base_station_x)**2 +
-                        (node.y - self.config.base_station_y)**2)
+        return math.hypot(node.x - self.config.base_station_x,
+                          node.y - self.config.base_station_y)
 
     def _transmit_packet(self, sender: Node, receiver: Optional[Node] = None,
                         packet_size: int = None) -> Tuple[bool, float, float, float]:
@@ -24,7 +24,6 @@ import random
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
-import copy
 
 @dataclass
 class TEENConfig:
@@ -98,11 +97,11 @@ class TEENNode:
     
     def distance_to(self, other_node: 'TEENNode') -> float:
         """计算到另一个节点的距离"""
-        return math.sqrt((self.x - other_node.x)**2 + (self.y - other_node.y)**2)
+        return math.hypot(self.x - other_node.x, self.y - other_node.y)
     
     def distance_to_base_station(self, bs_x: float, bs_y: float) -> float:
         """计算到基站的距离"""
-        return math.sqrt((self.x - bs_x)**2 + (self.y - bs_y)**2)
+        return math.hypot(self.x - bs_x, self.y - bs_y)
     
     def sense_environment(self) -> float:
         """模拟环境感知 - 返回感知值"""
@@ -156,6 +155,11 @@ class TEENProtocol:
     def __init__(self, config: TEENConfig):
         self.config = config
         self.nodes: List[TEENNode] = []
+        # 节点坐标按SoA布局分别存为连续数组 (按节点id索引)
+        self.node_x = np.empty(0)
+        self.node_y = np.empty(0)
+        # 节点到基站距离 (节点静止，初始化时计算一次)
+        self.d_to_bs = np.empty(0)
         self.clusters: Dict[int, Dict] = {}
         self.current_round = 0
         self.base_station = (config.base_station_x, config.base_station_y)
@@ -166,6 +170,8 @@ class TEENProtocol:
         self.packets_received = 0
         self.network_lifetime = 0
         self.round_stats = []
+        # 存活节点数：节点只在轮末状态更新时标记死亡，届时一并刷新
+        self._alive_count = 0
         
     def initialize_network(self, node_positions: List[Tuple[float, float]]):
         """初始化网络节点"""
@@ -181,6 +187,11 @@ class TEENProtocol:
                 soft_threshold=self.config.soft_threshold
             )
             self.nodes.append(node)
+        self.node_x = np.array([node.x for node in self.nodes], dtype=float)
+        self.node_y = np.array([node.y for node in self.nodes], dtype=float)
+        bs_x, bs_y = self.base_station
+        self.d_to_bs = np.hypot(self.node_x - bs_x, self.node_y - bs_y)
+        self._alive_count = sum(1 for node in self.nodes if node.is_alive())
     
     def _form_clusters(self):
         """形成簇结构 - 基于LEACH的聚类算法"""
@@ -225,38 +236,43 @@ class TEENProtocol:
             }
         
         # 为每个非簇头节点分配到最近的簇头
-        for node in alive_nodes:
-            if not node.is_cluster_head:
-                min_distance = float('inf')
-                best_cluster = -1
-                
-                for cluster_id, cluster_info in self.clusters.items():
-                    ch = cluster_info['head']
-                    distance = node.distance_to(ch)
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_cluster = cluster_id
-                
-                if best_cluster != -1:
-                    node.cluster_id = best_cluster
-                    node.cluster_head_id = self.clusters[best_cluster]['head'].id
-                    self.clusters[best_cluster]['members'].append(node)
+        # 坐标数组广播出成员到各簇头的平方距离，逐行argmin，只对选中的簇头开方
+        members = [node for node in alive_nodes if not node.is_cluster_head]
+        if members:
+            member_ids = np.array([node.id for node in members])
+            ch_ids = np.array([ch.id for ch in cluster_heads])
+            dx = self.node_x[member_ids, None] - self.node_x[ch_ids]
+            dy = self.node_y[member_ids, None] - self.node_y[ch_ids]
+            d2 = dx * dx + dy * dy
+            nearest = d2.argmin(axis=1)
+            nearest_d2 = d2[np.arange(len(members)), nearest]
 
-                    # 成员节点发送加入请求 - 计算能耗
-                    ch = self.clusters[best_cluster]['head']
-                    join_energy = self._calculate_transmission_energy(min_distance, 256)  # 加入请求包很小
-                    if node.current_energy >= join_energy:
-                        node.current_energy -= join_energy
-                        self.total_energy_consumed += join_energy
+            for node, best_cluster, min_d2 in zip(members, nearest.tolist(), nearest_d2.tolist()):
+                min_distance = math.sqrt(min_d2)
+                node.cluster_id = best_cluster
+                node.cluster_head_id = self.clusters[best_cluster]['head'].id
+                self.clusters[best_cluster]['members'].append(node)
 
-                        # 簇头接收加入请求
-                        if ch.is_alive():
-                            reception_energy = self._calculate_reception_energy(256)
-                            ch.current_energy -= reception_energy
-                            self.total_energy_consumed += reception_energy
+                # 成员节点发送加入请求 - 计算能耗
+                ch = self.clusters[best_cluster]['head']
+                join_energy = self._calculate_transmission_energy(min_distance, 256)  # 加入请求包很小
+                if node.current_energy >= join_energy:
+                    node.current_energy -= join_energy
+                    self.total_energy_consumed += join_energy
+
+                    # 簇头接收加入请求
+                    if ch.is_alive():
+                        reception_energy = self._calculate_reception_energy(256)
+                        ch.current_energy -= reception_energy
+                        self.total_energy_consumed += reception_energy
     
     def _broadcast_thresholds(self):
         """簇头广播阈值参数给成员节点"""
+        # 各簇相同的配置量与控制包能耗在循环外取出
+        broadcast_energy = self._calculate_transmission_energy(self.config.transmission_range, 128)  # 阈值包很小
+        reception_energy = self._calculate_reception_energy(128)
+        packet_size = self.config.packet_size
+
         for cluster_id, cluster_info in self.clusters.items():
             ch = cluster_info['head']
             hard_threshold = cluster_info['hard_threshold']
@@ -264,7 +280,6 @@ class TEENProtocol:
 
             # 簇头广播阈值参数 - 计算能耗
             if cluster_info['members']:  # 只有有成员时才广播
-                broadcast_energy = self._calculate_transmission_energy(self.config.transmission_range, 128)  # 阈值包很小
                 if ch.current_energy >= broadcast_energy:
                     ch.current_energy -= broadcast_energy
                     self.total_energy_consumed += broadcast_energy
@@ -275,20 +290,25 @@ class TEENProtocol:
                 member.soft_threshold = soft_threshold
 
                 # 成员节点接收阈值参数
-                reception_energy = self._calculate_reception_energy(128)
                 if member.current_energy >= reception_energy:
                     member.current_energy -= reception_energy
                     self.total_energy_consumed += reception_energy
                 
                 # 消耗通信能量
                 distance = ch.distance_to(member)
-                energy_cost = self._calculate_transmission_energy(distance, self.config.packet_size)
+                energy_cost = self._calculate_transmission_energy(distance, packet_size)
                 ch.current_energy -= energy_cost
                 self.total_energy_consumed += energy_cost
     
     def _data_transmission_phase(self):
         """数据传输阶段 - TEEN的核心"""
         packets_this_round = 0
+        # 配置量与数据包接收能耗在循环外取出
+        current_round = self.current_round
+        max_time_interval = self.config.max_time_interval
+        packet_size = self.config.packet_size
+        data_reception_energy = self._calculate_reception_energy(packet_size)
+        d_to_bs = self.d_to_bs
         
         for cluster_id, cluster_info in self.clusters.items():
             ch = cluster_info['head']
@@ -301,10 +321,10 @@ class TEENProtocol:
                     continue
                 
                 # TEEN核心逻辑：检查是否满足传输条件
-                if member.should_transmit(self.current_round, self.config.max_time_interval):
+                if member.should_transmit(current_round, max_time_interval):
                     # 传输数据到簇头
                     distance = member.distance_to(ch)
-                    energy_cost = self._calculate_transmission_energy(distance, self.config.packet_size)
+                    energy_cost = self._calculate_transmission_energy(distance, packet_size)
                     
                     if member.current_energy >= energy_cost:
                         member.current_energy -= energy_cost
@@ -314,16 +334,15 @@ class TEENProtocol:
                         
                         # 簇头接收数据
                         if ch.is_alive():
-                            reception_energy = self._calculate_reception_energy(self.config.packet_size)
-                            ch.current_energy -= reception_energy
+                            ch.current_energy -= data_reception_energy
                             ch.packets_received += 1
                             self.packets_received += 1  # 协议级别统计：成员到簇头的成功传输
-                            self.total_energy_consumed += reception_energy
+                            self.total_energy_consumed += data_reception_energy
             
             # 簇头聚合数据并传输到基站
             if ch.packets_received > 0 and ch.is_alive():
-                distance_to_bs = ch.distance_to_base_station(self.base_station[0], self.base_station[1])
-                energy_cost = self._calculate_transmission_energy(distance_to_bs, self.config.packet_size)
+                distance_to_bs = float(d_to_bs[ch.id])
+                energy_cost = self._calculate_transmission_energy(distance_to_bs, packet_size)
 
                 if ch.current_energy >= energy_cost:
                     ch.current_energy -= energy_cost
@@ -363,9 +382,9 @@ class TEENProtocol:
         """运行一轮协议"""
         self.current_round += 1
         
-        # 检查是否还有存活节点
-        alive_nodes = [node for node in self.nodes if node.is_alive()]
-        if not alive_nodes:
+        # 检查是否还有存活节点 (本轮开始时的存活数)
+        alive_count = self._alive_count
+        if not alive_count:
             return False
         
         # 每隔一定轮数重新形成簇
@@ -376,13 +395,16 @@ class TEENProtocol:
         # 数据传输阶段
         packets_sent = self._data_transmission_phase()
         
-        # 更新节点状态
+        # 更新节点状态，同时刷新存活数 (死亡状态不可恢复，能量只减不增)
+        remaining_alive = 0
         for node in self.nodes:
             if node.current_energy <= 0:
                 node.state = TEENNodeState.DEAD
+            else:
+                remaining_alive += 1
+        self._alive_count = remaining_alive
         
         # 记录统计信息
-        alive_count = len(alive_nodes)
         total_energy = sum(node.current_energy for node in self.nodes)
         
         round_stat = {
@@ -406,13 +428,12 @@ class TEENProtocol:
             
             # 每100轮输出一次状态
             if self.current_round % 100 == 0:
-                alive_nodes = len([n for n in self.nodes if n.is_alive()])
                 total_energy = sum(n.current_energy for n in self.nodes)
-                print(f"   轮数 {self.current_round}: 存活节点 {alive_nodes}, 剩余能量 {total_energy:.3f}J")
+                print(f"   轮数 {self.current_round}: 存活节点 {self._alive_count}, 剩余能量 {total_energy:.3f}J")
         
         # 计算最终统计
         self.network_lifetime = self.current_round
-        final_alive_nodes = len([n for n in self.nodes if n.is_alive()])
+        final_alive_nodes = self._alive_count
 
         # 修复：使用实际节点能量消耗计算总能耗
         initial_total_energy = len(self.nodes) * self.config.initial_energy
@@ -447,10 +468,9 @@ class TEENProtocol:
     
     def get_statistics(self) -> Dict:
         """获取当前统计信息"""
-        alive_nodes = [n for n in self.nodes if n.is_alive()]
         return {
             'round': self.current_round,
-            'alive_nodes': len(alive_nodes),
+            'alive_nodes': self._alive_count,
             'total_energy_consumed': self.total_energy_consumed,
             'packets_transmitted': self.packets_transmitted,
             'packets_received': self.packets_received,
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准协议回归测试
+
+测试内容:
+1. run_simulation_batch多进程结果与逐种子串行run_simulation一致
+2. LEACH向量化稳态通信与逐簇逐成员的标量参考实现一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import copy
+
+import numpy as np
+
+from benchmark_protocols import (
+    LEACHProtocol,
+    PEGASISProtocol,
+    NetworkConfig,
+    run_simulation_batch
+)
+from improved_energy_model import ImprovedEnergyModel, HardwarePlatform
+
+SEEDS = [1, 7, 42, 2025]
+
+def create_test_setup(num_nodes: int = 30, initial_energy: float = 0.05):
+    """小规模网络配置与能耗模型 (能量较低，几百轮内出现节点死亡)"""
+    config = NetworkConfig(
+        num_nodes=num_nodes,
+        initial_energy=initial_energy,
+        area_width=100,
+        area_height=100
+    )
+    return config, ImprovedEnergyModel(HardwarePlatform.CC2420_TELOSB)
+
+def _run_serial(protocol_cls, config, energy_model, seeds, max_rounds):
+    """逐种子串行运行仿真"""
+    results = []
+    for seed in seeds:
+        protocol = protocol_cls(config, energy_model, seed=seed)
+        protocol.verbose = False
+        results.append(protocol.run_simulation(max_rounds))
+    return results
+
+def test_batch_matches_serial():
+    """测试多进程批量仿真与串行仿真结果逐项一致"""
+    config, energy_model = create_test_setup()
+
+    for protocol_cls in (LEACHProtocol, PEGASISProtocol):
+        batch = run_simulation_batch(protocol_cls, config, energy_model, SEEDS,
+                                     max_rounds=300, max_workers=2)
+        serial = _run_serial(protocol_cls, config, energy_model, SEEDS, 300)
+
+        assert len(batch) == len(SEEDS)
+        for seed, batch_result, serial_result in zip(SEEDS, batch, serial):
+            assert batch_result == serial_result, f"{protocol_cls.__name__} seed={seed}"
+
+def _scalar_steady_state(protocol):
+    """
+    LEACH稳态通信的标量参考实现 (逐簇、逐成员依次结算)
+    与重构前的循环逻辑相同，直接读写协议的SoA数组
+    """
+    energy_model = protocol.energy_model
+    bits = protocol.config.packet_size * 8
+    energy = protocol.energy
+    alive = protocol.alive
+    rx_energy = energy_model.calculate_reception_energy(bits)
+    clusters = protocol.clusters
+
+    total_energy_consumed = 0.0
+    packets = 0
+
+    # 1. 成员节点向簇头发送数据
+    for ch_id, cluster_info in clusters.items():
+        if not alive[ch_id]:
+            continue
+        for member in cluster_info['members']:
+            m = member.id
+            if not alive[m]:
+                continue
+            tx_energy = energy_model.calculate_transmission_energy(bits, float(protocol.D[m, ch_id]))
+            if energy[m] > tx_energy and energy[ch_id] > rx_energy:
+                energy[m] -= tx_energy
+                energy[ch_id] -= rx_energy
+                total_energy_consumed += tx_energy + rx_energy
+                packets += 1
+            else:
+                if energy[m] <= tx_energy:
+                    alive[m] = False
+                    energy[m] = 0
+                if energy[ch_id] <= rx_energy:
+                    alive[ch_id] = False
+                    energy[ch_id] = 0
+
+    # 2. 簇头向基站发送聚合数据
+    for ch in protocol.cluster_heads:
+        c = ch.id
+        if not alive[c]:
+            continue
+        num_members = len(clusters.get(c, {}).get('members', []))
+        aggregation_energy = energy_model.calculate_processing_energy(bits * (num_members + 1))
+        tx_energy_to_bs = energy_model.calculate_transmission_energy(bits, float(protocol.d_to_bs[c]))
+        total_ch_energy_cost = aggregation_energy + tx_energy_to_bs
+        if energy[c] > total_ch_energy_cost:
+            energy[c] -= total_ch_energy_cost
+            total_energy_consumed += total_ch_energy_cost
+            packets += 1
+        else:
+            alive[c] = False
+            energy[c] = 0
+
+    protocol._alive_idx = np.flatnonzero(alive)
+    protocol.stats['total_energy_consumed'] += total_energy_consumed
+    protocol.stats['packets_transmitted'] += packets
+    protocol.stats['packets_received'] += packets
+
+def _prepare_round(protocol):
+    """完成一轮的簇头选举与成簇，停在稳态通信之前"""
+    protocol.is_ch[:] = False
+    protocol.cluster_id[:] = -1
+    protocol._round_rand = protocol._rng.random(protocol.config.num_nodes + 1)
+    protocol.cluster_heads = protocol._select_cluster_heads()
+    protocol._form_clusters(protocol.cluster_heads)
+
+def test_leach_steady_state_matches_scalar():
+    """测试LEACH向量化稳态通信与标量参考实现的能量、存活状态和统计一致"""
+    config, energy_model = create_test_setup(num_nodes=60)
+
+    for seed in SEEDS:
+        protocol = LEACHProtocol(config, energy_model, seed=seed)
+        protocol.debug_rounds = 0
+        # 随机化剩余能量 (部分节点接近耗尽)，覆盖成员发送失败和簇头接收能力耗尽的分支
+        energy_rng = np.random.default_rng(seed)
+        protocol.energy[:] = energy_rng.uniform(1e-3, 2e-2, config.num_nodes)
+
+        for _ in range(5):
+            if not protocol._alive_idx.size:
+                break
+            _prepare_round(protocol)
+            reference = copy.deepcopy(protocol)
+
+            protocol._steady_state_communication()
+            _scalar_steady_state(reference)
+
+            np.testing.assert_array_equal(protocol.alive, reference.alive)
+            np.testing.assert_allclose(protocol.energy, reference.energy, rtol=1e-12, atol=0)
+            for key in ('packets_transmitted', 'packets_received'):
+                assert protocol.stats[key] == reference.stats[key], f"seed={seed} {key}"
+            assert np.isclose(protocol.stats['total_energy_consumed'],
+                              reference.stats['total_energy_consumed'], rtol=1e-12, atol=0)
+            protocol.round_number += 1
+
+if __name__ == "__main__":
+    test_batch_matches_serial()
+    test_leach_steady_state_matches_scalar()
+    print("基准协议回归测试通过")